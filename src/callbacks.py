@@ -0,0 +1,22 @@
+"""
+Callback data factories for the bot's inline keyboards.
+
+aiogram unpacks callback data into these classes once, in the router filter,
+so handlers receive parsed fields instead of splitting callback.data.
+"""
+from aiogram.filters.callback_data import CallbackData
+
+
+class ContentTypeCallback(CallbackData, prefix="content_type"):
+    """Content type selection: 'text', 'video' or 'skip'."""
+    content_type: str
+
+
+class TagCallback(CallbackData, prefix="tag"):
+    """Tag keyboard button: a tag ID, 'new' or 'skip'."""
+    value: str
+
+
+class TagPageCallback(CallbackData, prefix="page"):
+    """Tag keyboard navigation: a page number, or 'current' for the page indicator."""
+    page: str
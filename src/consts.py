@@ -1,18 +1,19 @@
 """Project constants."""
 import os
 from pathlib import Path
-from dotenv import dotenv_values
+from dotenv import load_dotenv
 
 PROJECT_PATH = Path(__file__).parent.parent
 ENV_PATH = PROJECT_PATH / ".env"
-config_env = dotenv_values(ENV_PATH)
+# Real environment variables take precedence over the .env file
+load_dotenv(ENV_PATH, override=False)
 
 
-def check_env_or_raise(var_name: str):
-    var_name = os.getenv(var_name, config_env.get(var_name))
-    if not var_name:
+def check_env_or_raise(var_name: str, default: str | None = None) -> str:
+    value = os.environ.get(var_name, default)
+    if not value:
         raise ValueError(f"{var_name} not found in environment variables or .env file")
-    return var_name
+    return value
 
 
 BOT_TOKEN = check_env_or_raise("BOT_TOKEN")
@@ -22,3 +23,16 @@ POSTGRES_PASSWORD = check_env_or_raise("POSTGRES_PASSWORD")
 POSTGRES_DB = check_env_or_raise("POSTGRES_DB")
 POSTGRES_HOST = check_env_or_raise("POSTGRES_HOST")
 POSTGRES_PORT = check_env_or_raise("POSTGRES_PORT")
+
+# Connection pool sizing. DB_POOL_MAX must stay below PostgreSQL max_connections.
+DB_POOL_MIN = int(check_env_or_raise("DB_POOL_MIN", default="2"))
+DB_POOL_MAX = int(check_env_or_raise("DB_POOL_MAX", default="20"))
+DB_POOL_MAX_QUERIES = int(check_env_or_raise("DB_POOL_MAX_QUERIES", default="50000"))
+DB_POOL_MAX_INACTIVE_LIFETIME = float(check_env_or_raise("DB_POOL_MAX_INACTIVE_LIFETIME", default="300"))
+DB_COMMAND_TIMEOUT = float(check_env_or_raise("DB_COMMAND_TIMEOUT", default="10"))
+
+# FSM storage. With REDIS_URL set, conversation state lives in Redis, so it
+# survives restarts and can be shared by several bot processes; otherwise it is
+# kept in memory. Redis drops abandoned states after FSM_STATE_TTL seconds.
+REDIS_URL = os.environ.get("REDIS_URL") or None
+FSM_STATE_TTL = int(check_env_or_raise("FSM_STATE_TTL", default="3600"))
@@ -1,17 +1,345 @@
 """
 Database operations for the ReadLater bot.
 """
+import json
 import logging
+import random
+import time
 from typing import Dict, List, Any, Optional
 import asyncpg
 
 from src.consts import (
     POSTGRES_USER, POSTGRES_PASSWORD,
-    POSTGRES_DB, POSTGRES_HOST, POSTGRES_PORT
+    POSTGRES_DB, POSTGRES_HOST, POSTGRES_PORT,
+    DB_POOL_MIN, DB_POOL_MAX, DB_POOL_MAX_QUERIES,
+    DB_POOL_MAX_INACTIVE_LIFETIME, DB_COMMAND_TIMEOUT
 )
+from src.db.prefetch import drop_prefetched_pages
 
 logger = logging.getLogger(__name__)
 
+# Content item columns the handlers read (short_description/date_read are unused)
+_CONTENT_COLUMNS = "id, content, source, message_id, chat_id, content_type, status, date_added"
+_CI_CONTENT_COLUMNS = ", ".join(f"ci.{column}" for column in _CONTENT_COLUMNS.split(", "))
+
+# List pages only show the start of each item's content, so the list queries
+# send at most one character more than that, enough to tell it was cut, instead
+# of whole forwarded posts
+CONTENT_PREVIEW_LENGTH = 30
+_CI_LIST_COLUMNS = ", ".join(
+    f"left(ci.content, {CONTENT_PREVIEW_LENGTH + 1}) AS content" if column == "content" else f"ci.{column}"
+    for column in _CONTENT_COLUMNS.split(", ")
+)
+
+# Tag names of the content item aliased as ci, aggregated in the same
+# statement so list queries don't need a second round-trip for tags
+_CI_TAGS_COLUMN = """
+    COALESCE((
+        SELECT array_agg(t.name ORDER BY t.name)
+        FROM content_item_tags item_tags
+        JOIN tags t ON t.id = item_tags.tag_id
+        WHERE item_tags.content_item_id = ci.id
+    ), '{}') AS tags
+"""
+
+# A user's tag list only changes when a tag is created, so tag menus are served
+# from memory for a short while; add_tag/attach_tag drop the user's entry.
+# The TTL only bounds staleness from changes made outside this process and is
+# long enough to cover one add-and-tag flow of the add_material handlers.
+_USER_TAGS_CACHE_TTL = 60.0
+_USER_TAGS_CACHE_MAX_USERS = 10_000
+
+# Tags are never renamed or deleted by the bot, so lookups by ID are cached the
+# same way; the TTL again only bounds changes made outside this process.
+_TAG_BY_ID_CACHE_TTL = 60.0
+_TAG_BY_ID_CACHE_MAX_SIZE = 10_000
+
+# /random without a type filter picks from a cached list of the user's unread
+# item IDs, so a call is one primary-key lookup instead of counting and
+# skipping through the unread index. Adds and status changes made through this
+# process keep the list current; an ID that turned stale anyway (e.g. deleted)
+# drops the entry and falls back to the SQL pick.
+_UNREAD_IDS_CACHE_TTL = 60.0
+_UNREAD_IDS_CACHE_MAX_USERS = 10_000
+
+# Hot-path SQL is kept as module-level constants: asyncpg keys its
+# per-connection statement cache on the exact query text, so reusing the same
+# string skips the Parse/Describe round-trip after the first call.
+_ADD_CONTENT_ITEM_SQL = """
+    INSERT INTO content_items
+    (user_id, content, source, message_id, chat_id, content_type)
+    VALUES ($1, $2, $3, $4, $5, $6)
+    RETURNING id
+"""
+
+# Returns the owner, so the user's prefetched list pages can be dropped
+_UPDATE_CONTENT_TYPE_SQL = """
+    UPDATE content_items
+    SET content_type = $1
+    WHERE id = $2
+    RETURNING user_id
+"""
+
+# Returns the updated row, so callers can re-render the item without reading it back
+_UPDATE_CONTENT_STATUS_SQL = f"""
+    UPDATE content_items
+    SET status = $1::VARCHAR,
+        date_read = CASE WHEN $1::VARCHAR = 'processed' THEN CURRENT_TIMESTAMP ELSE NULL END
+    WHERE id = $2
+    RETURNING {_CONTENT_COLUMNS}, user_id
+"""
+
+_GET_CONTENT_ITEM_BY_ID_SQL = f"SELECT {_CONTENT_COLUMNS} FROM content_items WHERE id = $1"
+
+_DELETE_CONTENT_ITEM_SQL = "DELETE FROM content_items WHERE id = $1 RETURNING user_id"
+
+# Random pick by skipping a random number of matching rows instead of
+# ORDER BY RANDOM(), which sorts the user's whole unread set on every call.
+# The count and the scan are served by idx_content_items_user_status_date, or
+# idx_content_items_user_status_type_date when filtering by content type.
+# The content type variant is a separate statement rather than a nullable
+# "$2 IS NULL OR content_type = $2" filter, so its cached generic plan can
+# still use the content_type column of the index.
+_RANDOM_UNREAD_FILTER = "user_id = $1 AND status = 'unread'"
+_RANDOM_UNREAD_BY_TYPE_FILTER = f"{_RANDOM_UNREAD_FILTER} AND content_type = $2"
+
+
+def _random_pick_sql(where_clause: str) -> str:
+    return f"""
+    SELECT {_CONTENT_COLUMNS} FROM content_items
+    WHERE {where_clause}
+    OFFSET floor(random() * (
+        SELECT COUNT(*) FROM content_items WHERE {where_clause}
+    ))::bigint
+    LIMIT 1
+"""
+
+
+_RANDOM_UNREAD_SQL = _random_pick_sql(_RANDOM_UNREAD_FILTER)
+_RANDOM_UNREAD_BY_TYPE_SQL = _random_pick_sql(_RANDOM_UNREAD_BY_TYPE_FILTER)
+_UNREAD_IDS_SQL = f"SELECT id FROM content_items WHERE {_RANDOM_UNREAD_FILTER}"
+
+def _optional_filters(alias: str, has_type: bool, has_status: bool) -> tuple[str, int]:
+    """Build the WHERE clause for the optional type/status filters after $1 = user_id."""
+    conditions = [f"{alias}user_id = $1"]
+    if has_type:
+        conditions.append(f"{alias}content_type = ${len(conditions) + 1}")
+    if has_status:
+        conditions.append(f"{alias}status = ${len(conditions) + 1}")
+    return " AND ".join(conditions), len(conditions)
+
+
+def _last_content_item_sql(has_type: bool, has_status: bool) -> str:
+    where_clause, _ = _optional_filters("", has_type, has_status)
+    return f"""
+    SELECT {_CONTENT_COLUMNS} FROM content_items
+    WHERE {where_clause}
+    ORDER BY date_added DESC
+    LIMIT 1
+"""
+
+
+# Unread items first, newest first: matches idx_content_items_user_unread_first_date,
+# so a page is read from the index instead of sorting all of the user's items.
+# id breaks ties between items that share date_added (e.g. added in one
+# transaction); without it OFFSET pages over such ties may repeat or skip
+# items.
+_UNREAD_FIRST_ORDER = "ORDER BY (ci.status <> 'unread'), ci.date_added DESC, ci.id DESC"
+
+
+def _page_with_tags_sql(page_sql: str) -> str:
+    """
+    Attach tags to a page of content items selected by page_sql.
+
+    The page query also returns total_count, the number of matching items
+    before LIMIT/OFFSET, for the page count. The tags subquery is kept in the
+    outer query so it only runs for the rows of the page, not for every row
+    the window has to count.
+    """
+    return f"""
+    SELECT ci.*, {_CI_TAGS_COLUMN}
+    FROM ({page_sql}) ci
+    {_UNREAD_FIRST_ORDER}
+"""
+
+
+def _user_content_sql(has_type: bool, has_status: bool) -> str:
+    where_clause, param_count = _optional_filters("ci.", has_type, has_status)
+    return _page_with_tags_sql(f"""
+        SELECT {_CI_LIST_COLUMNS}, COUNT(*) OVER () AS total_count
+        FROM content_items ci
+        WHERE {where_clause}
+        {_UNREAD_FIRST_ORDER}
+        LIMIT ${param_count + 1} OFFSET ${param_count + 2}
+    """)
+
+
+# Every filter combination is materialized once, keyed by
+# (content_type given, status given), so each call reuses the same query text
+_FILTER_COMBINATIONS = [(has_type, has_status) for has_type in (False, True) for has_status in (False, True)]
+_LAST_CONTENT_ITEM_SQL = {key: _last_content_item_sql(*key) for key in _FILTER_COMBINATIONS}
+_USER_CONTENT_SQL = {key: _user_content_sql(*key) for key in _FILTER_COMBINATIONS}
+
+# Items that have ALL of the given tags
+_CONTENT_BY_ALL_TAGS_SQL = _page_with_tags_sql(f"""
+        SELECT {_CI_LIST_COLUMNS}, COUNT(*) OVER () AS total_count
+        FROM content_items ci
+        WHERE ci.user_id = $1 AND ci.id IN (
+            SELECT cit.content_item_id
+            FROM content_item_tags cit
+            WHERE cit.tag_id = ANY($2::int[])
+            GROUP BY cit.content_item_id
+            HAVING COUNT(DISTINCT cit.tag_id) = $3
+        )
+        {_UNREAD_FIRST_ORDER}
+        LIMIT $4 OFFSET $5
+    """)
+
+# Items that have ANY of the given tags; EXISTS avoids joining and
+# de-duplicating every matching tag row
+_CONTENT_BY_ANY_TAGS_SQL = _page_with_tags_sql(f"""
+        SELECT {_CI_LIST_COLUMNS}, COUNT(*) OVER () AS total_count
+        FROM content_items ci
+        WHERE ci.user_id = $1 AND EXISTS (
+            SELECT 1 FROM content_item_tags cit
+            WHERE cit.content_item_id = ci.id AND cit.tag_id = ANY($2::int[])
+        )
+        {_UNREAD_FIRST_ORDER}
+        LIMIT $3 OFFSET $4
+    """)
+
+# All statistics in one scan: per-type counts via FILTER, rolled up into the
+# totals and the jsonb type distribution. The CTE is referenced once, so it is
+# inlined instead of materializing every user row.
+_USER_STATISTICS_SQL = """
+    WITH per_type AS (
+        SELECT
+            content_type,
+            COUNT(*) AS total,
+            COUNT(*) FILTER (WHERE status = 'unread') AS unread,
+            COUNT(*) FILTER (WHERE status = 'processed') AS read,
+            COUNT(*) FILTER (WHERE status = 'processed'
+                               AND date_read > CURRENT_TIMESTAMP - INTERVAL '7 days') AS read_last_week,
+            COUNT(*) FILTER (WHERE status = 'processed'
+                               AND date_read > CURRENT_TIMESTAMP - INTERVAL '30 days') AS read_last_month
+        FROM content_items
+        WHERE user_id = $1
+        GROUP BY content_type
+    )
+    SELECT
+        COALESCE(SUM(total), 0)::bigint AS total,
+        COALESCE(SUM(unread), 0)::bigint AS unread,
+        COALESCE(SUM(read), 0)::bigint AS read,
+        COALESCE(SUM(read_last_week), 0)::bigint AS read_last_week,
+        COALESCE(SUM(read_last_month), 0)::bigint AS read_last_month,
+        COALESCE(
+            jsonb_object_agg(content_type, total) FILTER (WHERE content_type IS NOT NULL),
+            '{}'::jsonb
+        ) AS content_types
+    FROM per_type
+"""
+
+
+# Create (or reuse) a tag and link it to a content item in one round-trip.
+# DO UPDATE instead of DO NOTHING so RETURNING yields the id of an existing tag.
+_ATTACH_TAG_SQL = """
+    WITH tag AS (
+        INSERT INTO tags (user_id, name)
+        VALUES ($1, $2)
+        ON CONFLICT (user_id, name) DO UPDATE SET name = EXCLUDED.name
+        RETURNING id, xmax = 0 AS inserted
+    ), link AS (
+        INSERT INTO content_item_tags (content_item_id, tag_id)
+        SELECT $3, id FROM tag
+        ON CONFLICT DO NOTHING
+    )
+    SELECT id, inserted FROM tag
+"""
+
+
+# DO UPDATE instead of DO NOTHING so RETURNING yields the id of an existing tag.
+# xmax is 0 only for a freshly inserted row, which tells a new tag apart.
+_ADD_TAG_SQL = """
+    INSERT INTO tags (user_id, name)
+    VALUES ($1, $2)
+    ON CONFLICT (user_id, name) DO UPDATE SET name = EXCLUDED.name
+    RETURNING id, xmax = 0 AS inserted
+"""
+
+# Both return the item's owner if a link was added and nothing if all the
+# links already existed, so only a real change drops prefetched list pages
+_ADD_TAG_TO_CONTENT_SQL = """
+    WITH link AS (
+        INSERT INTO content_item_tags (content_item_id, tag_id)
+        VALUES ($1, $2)
+        ON CONFLICT DO NOTHING
+        RETURNING content_item_id
+    )
+    SELECT user_id FROM content_items WHERE id = $1 AND EXISTS (SELECT 1 FROM link)
+"""
+
+_ADD_TAGS_TO_CONTENT_SQL = """
+    WITH link AS (
+        INSERT INTO content_item_tags (content_item_id, tag_id)
+        SELECT $1, unnest($2::INTEGER[])
+        ON CONFLICT DO NOTHING
+        RETURNING content_item_id
+    )
+    SELECT user_id FROM content_items WHERE id = $1 AND EXISTS (SELECT 1 FROM link)
+"""
+
+
+_USER_TAGS_SQL = "SELECT id, name FROM tags WHERE user_id = $1 ORDER BY name"
+
+_GET_TAG_BY_ID_SQL = "SELECT id, name FROM tags WHERE id = $1"
+
+# Read-only hot statements run once per new connection with arguments that
+# match no rows. Connection.prepare() bypasses asyncpg's statement cache, so
+# executing them is the public way to have their plans cached up front.
+# The set mirrors what the commands actually run: /last and /all filter on
+# 'unread', /random goes through the unread ID list and the by-ID lookup, and
+# /bytags pages through the all-tags query.
+_WARM_UP_QUERIES = (
+    (_GET_CONTENT_ITEM_BY_ID_SQL, (0,)),
+    (_UNREAD_IDS_SQL, (0,)),
+    (_RANDOM_UNREAD_SQL, (0,)),
+    (_LAST_CONTENT_ITEM_SQL[(False, True)], (0, "unread")),
+    (_USER_CONTENT_SQL[(False, True)], (0, "unread", 1, 0)),
+    (_CONTENT_BY_ALL_TAGS_SQL, (0, [0], 1, 1, 0)),
+    (_USER_TAGS_SQL, (0,)),
+    (_GET_TAG_BY_ID_SQL, (0,)),
+)
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """
+    Configure a freshly opened pool connection.
+
+    jsonb is decoded straight into Python objects, and the hottest statements
+    are cached before the connection serves its first request.
+    """
+    await conn.set_type_codec(
+        "jsonb", encoder=json.dumps, decoder=json.loads, schema="pg_catalog"
+    )
+    for query, args in _WARM_UP_QUERIES:
+        try:
+            await conn.fetch(query, *args)
+        except asyncpg.PostgresError as e:
+            # e.g. the schema is not created yet; the statement is prepared lazily then
+            logger.warning("Could not warm up statement cache: %s", e)
+            break
+
+
+# Session settings sent in the startup packet, so they cost no extra round-trip.
+# They assume the bot's workload: small OLTP statements on indexed columns.
+_SERVER_SETTINGS = {
+    # JIT compilation only pays off for long analytical queries
+    "jit": "off",
+    # Reuse the generic plan of a cached statement instead of planning it
+    # with custom parameter values on its first five executions
+    "plan_cache_mode": "force_generic_plan",
+}
+
 
 class Database:
     """Database connection and operations."""
@@ -19,6 +347,13 @@ class Database:
     def __init__(self):
         """Initialize database connection pool."""
         self.pool = None
+        # user_id -> (expiry time, tag records, tag names by ID); the bot runs
+        # on a single event loop, so no locking is needed
+        self._user_tags_cache: dict[int, tuple[float, list[asyncpg.Record], dict[int, str]]] = {}
+        # tag_id -> (expiry time, tag record); only found tags are cached
+        self._tag_by_id_cache: dict[int, tuple[float, asyncpg.Record]] = {}
+        # user_id -> (expiry time, unread content item IDs)
+        self._unread_ids_cache: dict[int, tuple[float, list[int]]] = {}
 
     async def connect(self):
         """Create a connection pool to the database."""
@@ -28,7 +363,21 @@ class Database:
                 password=POSTGRES_PASSWORD,
                 database=POSTGRES_DB,
                 host=POSTGRES_HOST,
-                port=POSTGRES_PORT
+                port=POSTGRES_PORT,
+                # Keep a couple of warm connections instead of opening max_size
+                # handshakes on startup; grow on bursts up to DB_POOL_MAX.
+                min_size=DB_POOL_MIN,
+                max_size=DB_POOL_MAX,
+                max_inactive_connection_lifetime=DB_POOL_MAX_INACTIVE_LIFETIME,
+                max_queries=DB_POOL_MAX_QUERIES,
+                command_timeout=DB_COMMAND_TIMEOUT,
+                # Plans stay cached for the connection lifetime regardless of
+                # statement size; the set of distinct query texts is small.
+                statement_cache_size=1024,
+                max_cached_statement_lifetime=0,
+                max_cacheable_statement_size=0,
+                init=_init_connection,
+                server_settings=_SERVER_SETTINGS
             )
             logger.info("Connected to database")
         except Exception as e:
@@ -64,22 +413,18 @@ class Database:
         Returns:
             int: ID of the created content item
         """
-        async with self.pool.acquire() as conn:
-            try:
-                query = """
-                    INSERT INTO content_items
-                    (user_id, content, source, message_id, chat_id, content_type)
-                    VALUES ($1, $2, $3, $4, $5, $6)
-                    RETURNING id
-                """
-                item_id = await conn.fetchval(
-                    query, user_id, content, source, message_id, chat_id, content_type
-                )
-                logger.info("Added new content item (id=%s) for user %s", item_id, user_id)
-                return item_id
-            except Exception as e:
-                logger.error("Error adding content item for user %s: %s", user_id, e)
-                raise
+        try:
+            item_id = await self.pool.fetchval(
+                _ADD_CONTENT_ITEM_SQL, user_id, content, source, message_id, chat_id, content_type
+            )
+            # New items start out unread, and shift every page of the list
+            self._set_cached_unread(user_id, item_id, True)
+            drop_prefetched_pages(user_id)
+            logger.debug("Added new content item (id=%s) for user %s", item_id, user_id)
+            return item_id
+        except Exception as e:
+            logger.error("Error adding content item for user %s: %s", user_id, e)
+            raise
 
     async def update_content_type(self, content_id: int, content_type: str) -> bool:
         """
@@ -92,21 +437,17 @@ class Database:
         Returns:
             bool: Success status
         """
-        async with self.pool.acquire() as conn:
-            try:
-                query = """
-                    UPDATE content_items
-                    SET content_type = $1
-                    WHERE id = $2
-                """
-                await conn.execute(query, content_type, content_id)
-                logger.info("Updated content type to '%s' for item %s", content_type, content_id)
-                return True
-            except Exception as e:
-                logger.error("Error updating content type for item %s: %s", content_id, e)
-                return False
-
-    async def update_content_status(self, content_id: int, status: str) -> bool:
+        try:
+            user_id = await self.pool.fetchval(_UPDATE_CONTENT_TYPE_SQL, content_type, content_id)
+            if user_id is not None:
+                drop_prefetched_pages(user_id)
+            logger.info("Updated content type to '%s' for item %s", content_type, content_id)
+            return True
+        except Exception as e:
+            logger.error("Error updating content type for item %s: %s", content_id, e)
+            return False
+
+    async def update_content_status(self, content_id: int, status: str) -> asyncpg.Record | None:
         """
         Update the status of a content item.
 
@@ -115,28 +456,28 @@ class Database:
             status: New status ('unread' or 'processed')
 
         Returns:
-            bool: Success status
+            Record or None: Updated content item, or None if it was not found
+            or the update failed
         """
-        async with self.pool.acquire() as conn:
-            try:
-                # Use a parameterized query with explicit type casting for the status
-                query = """
-                    UPDATE content_items
-                    SET status = $1::VARCHAR,
-                        date_read = CASE WHEN $1::VARCHAR = 'processed' THEN CURRENT_TIMESTAMP ELSE NULL END
-                    WHERE id = $2
-                """
-                await conn.execute(query, status, content_id)
-                logger.info("Updated status to '%s' for item %s", status, content_id)
-                return True
-            except Exception as e:
-                logger.error("Error updating status for item %s: %s", content_id, e)
-                return False
+        try:
+            # Parameterized query with explicit type casting for the status
+            record = await self.pool.fetchrow(_UPDATE_CONTENT_STATUS_SQL, status, content_id)
+            if record is None:
+                logger.warning("Content item %s not found for status update", content_id)
+                return None
+            # Lists are ordered unread first, so the item may change pages
+            self._set_cached_unread(record["user_id"], content_id, status == "unread")
+            drop_prefetched_pages(record["user_id"])
+            logger.info("Updated status to '%s' for item %s", status, content_id)
+            return record
+        except Exception as e:
+            logger.error("Error updating status for item %s: %s", content_id, e)
+            return None
 
     async def get_last_content_item(self,
                                     user_id: int,
                                     content_type: str | None = None,
-                                    status: str | None = None) -> Dict[str, Any] | None:
+                                    status: str | None = None) -> asyncpg.Record | None:
         """
         Get the last added content item for a user.
 
@@ -146,60 +487,27 @@ class Database:
             status: Optional filter by status ('unread' or 'processed')
 
         Returns:
-            Dict or None: Content item data or None if not found
-        """
-        async with self.pool.acquire() as conn:
-            try:
-                query_conditions = ["user_id = $1"]
-                query_params = [user_id]
-                param_index = 2
-
-                # Add content_type filter if provided
-                if content_type:
-                    query_conditions.append(f"content_type = ${param_index}")
-                    query_params.append(content_type)
-                    param_index += 1
-
-                # Add status filter if provided
-                if status:
-                    query_conditions.append(f"status = ${param_index}")
-                    query_params.append(status)
-                    param_index += 1
-
-                # Combine conditions with AND
-                where_clause = " AND ".join(query_conditions)
-
-                # Build the complete query
-                query = f"""
-                    SELECT * FROM content_items
-                    WHERE {where_clause}
-                    ORDER BY date_added DESC
-                    LIMIT 1
-                """
-
-                record = await conn.fetchrow(query, *query_params)
-
-                # Log appropriate message based on filters
-                if content_type and status:
-                    logger.info("Retrieved last %s content with status '%s' for user %s",
-                                content_type, status, user_id)
-                elif content_type:
-                    logger.info("Retrieved last %s content for user %s", content_type, user_id)
-                elif status:
-                    logger.info("Retrieved last content with status '%s' for user %s", status, user_id)
-                else:
-                    logger.info("Retrieved last content item for user %s", user_id)
-
-                if record:
-                    return dict(record)
-                return None
-            except Exception as e:
-                logger.error("Error getting last content item for user %s: %s", user_id, e)
-                return None
+            Record or None: Content item data or None if not found
+        """
+        try:
+            query = _LAST_CONTENT_ITEM_SQL[(bool(content_type), bool(status))]
+            query_params = [user_id, *(param for param in (content_type, status) if param)]
+
+            record = await self.pool.fetchrow(query, *query_params)
+
+            logger.debug("Retrieved last content item (type=%s, status=%s) for user %s",
+                         content_type, status, user_id)
+
+            if record:
+                return record
+            return None
+        except Exception as e:
+            logger.error("Error getting last content item for user %s: %s", user_id, e)
+            return None
 
     async def get_random_content_item(self,
                                       user_id: int,
-                                      content_type: str | None = None) -> Dict[str, Any] | None:
+                                      content_type: str | None = None) -> asyncpg.Record | None:
         """
         Get a random unread content item for a user.
 
@@ -208,35 +516,55 @@ class Database:
             content_type: Optional filter by content type
 
         Returns:
-            Dict or None: Content item data or None if not found
-        """
-        async with self.pool.acquire() as conn:
-            try:
-                if content_type:
-                    query = """
-                        SELECT * FROM content_items
-                        WHERE user_id = $1 AND status = 'unread' AND content_type = $2
-                        ORDER BY RANDOM()
-                        LIMIT 1
-                    """
-                    record = await conn.fetchrow(query, user_id, content_type)
-                    logger.info("Retrieved random unread %s content for user %s", content_type, user_id)
-                else:
-                    query = """
-                        SELECT * FROM content_items
-                        WHERE user_id = $1 AND status = 'unread'
-                        ORDER BY RANDOM()
-                        LIMIT 1
-                    """
-                    record = await conn.fetchrow(query, user_id)
-                    logger.info("Retrieved random unread content item for user %s", user_id)
-
-                if record:
-                    return dict(record)
-                return None
-            except Exception as e:
-                logger.error("Error getting random content item for user %s: %s", user_id, e)
-                return None
+            Record or None: Content item data or None if not found
+        """
+        try:
+            if content_type:
+                record = await self.pool.fetchrow(_RANDOM_UNREAD_BY_TYPE_SQL, user_id, content_type)
+                logger.debug("Retrieved random unread %s content for user %s", content_type, user_id)
+            else:
+                record = await self._pick_cached_unread(user_id)
+                if record is None:
+                    record = await self.pool.fetchrow(_RANDOM_UNREAD_SQL, user_id)
+                logger.debug("Retrieved random unread content item for user %s", user_id)
+
+            if record:
+                return record
+            return None
+        except Exception as e:
+            logger.error("Error getting random content item for user %s: %s", user_id, e)
+            return None
+
+    async def _pick_cached_unread(self, user_id: int) -> asyncpg.Record | None:
+        """Pick a random unread item from the cached unread IDs, or None to fall back to SQL."""
+        cached = self._unread_ids_cache.get(user_id)
+        if not cached or cached[0] <= time.monotonic():
+            if len(self._unread_ids_cache) >= _UNREAD_IDS_CACHE_MAX_USERS:
+                self._unread_ids_cache.clear()
+            unread_ids = [record["id"] for record in await self.pool.fetch(_UNREAD_IDS_SQL, user_id)]
+            cached = self._unread_ids_cache[user_id] = (time.monotonic() + _UNREAD_IDS_CACHE_TTL, unread_ids)
+
+        unread_ids = cached[1]
+        if not unread_ids:
+            return None
+
+        record = await self.pool.fetchrow(_GET_CONTENT_ITEM_BY_ID_SQL, random.choice(unread_ids))
+        if record is None or record["status"] != "unread":
+            # Changed outside this process; reload on the next call
+            self._unread_ids_cache.pop(user_id, None)
+            return None
+        return record
+
+    def _set_cached_unread(self, user_id: int, content_id: int, unread: bool) -> None:
+        """Add or remove an item in the user's cached unread IDs, if they are cached."""
+        cached = self._unread_ids_cache.get(user_id)
+        if not cached:
+            return
+        unread_ids = cached[1]
+        if unread and content_id not in unread_ids:
+            unread_ids.append(content_id)
+        elif not unread and content_id in unread_ids:
+            unread_ids.remove(content_id)
 
     async def delete_content_item(self, content_id: int) -> bool:
         """
@@ -248,21 +576,19 @@ class Database:
         Returns:
             bool: Success status
         """
-        async with self.pool.acquire() as conn:
-            try:
-                # Begin a transaction
-                async with conn.transaction():
-                    # The content_item_tags references will be automatically deleted due to CASCADE
-                    query = "DELETE FROM content_items WHERE id = $1"
-                    await conn.execute(query, content_id)
-
-                logger.info("Deleted content item %s", content_id)
-                return True
-            except Exception as e:
-                logger.error("Error deleting content item %s: %s", content_id, e)
-                return False
+        try:
+            # A single statement runs in its own implicit transaction; the
+            # content_item_tags references are deleted via ON DELETE CASCADE
+            user_id = await self.pool.fetchval(_DELETE_CONTENT_ITEM_SQL, content_id)
+            if user_id is not None:
+                drop_prefetched_pages(user_id)
+            logger.info("Deleted content item %s", content_id)
+            return True
+        except Exception as e:
+            logger.error("Error deleting content item %s: %s", content_id, e)
+            return False
 
-    async def get_content_item_by_id(self, content_id: int) -> Dict[str, Any] | None:
+    async def get_content_item_by_id(self, content_id: int) -> asyncpg.Record | None:
         """
         Get a specific content item by ID.
 
@@ -270,26 +596,46 @@ class Database:
             content_id: Content item ID
 
         Returns:
-            Dict or None: Content item data or None if not found
+            Record or None: Content item data or None if not found
         """
-        async with self.pool.acquire() as conn:
-            try:
-                query = "SELECT * FROM content_items WHERE id = $1"
-                record = await conn.fetchrow(query, content_id)
+        try:
+            record = await self.pool.fetchrow(_GET_CONTENT_ITEM_BY_ID_SQL, content_id)
 
-                if record:
-                    logger.info("Retrieved content item %s", content_id)
-                    return dict(record)
+            if record:
+                logger.debug("Retrieved content item %s", content_id)
+                return record
 
-                logger.warning("Content item %s not found", content_id)
-                return None
-            except Exception as e:
-                logger.error("Error getting content item %s: %s", content_id, e)
-                return None
+            logger.warning("Content item %s not found", content_id)
+            return None
+        except Exception as e:
+            logger.error("Error getting content item %s: %s", content_id, e)
+            return None
 
     # Tag operations
 
-    async def get_user_tags(self, user_id: int) -> list[Dict[str, Any]]:
+    async def _get_cached_user_tags(self, user_id: int) -> tuple[float, list[asyncpg.Record], dict[int, str]] | None:
+        """Return the user's tag cache entry, loading it if missing or expired."""
+        cached = self._user_tags_cache.get(user_id)
+        if cached and cached[0] > time.monotonic():
+            return cached
+
+        try:
+            records = await self.pool.fetch(_USER_TAGS_SQL, user_id)
+        except Exception as e:
+            logger.error("Error getting tags for user %s: %s", user_id, e)
+            return None
+
+        if len(self._user_tags_cache) >= _USER_TAGS_CACHE_MAX_USERS:
+            self._user_tags_cache.clear()
+        cached = (
+            time.monotonic() + _USER_TAGS_CACHE_TTL,
+            records,
+            {record["id"]: record["name"] for record in records},
+        )
+        self._user_tags_cache[user_id] = cached
+        return cached
+
+    async def get_user_tags(self, user_id: int) -> list[asyncpg.Record]:
         """
         Get all tags for a user.
 
@@ -297,16 +643,25 @@ class Database:
             user_id: Telegram user ID
 
         Returns:
-            List of tag objects
+            List of tag records (id, name)
+        """
+        cached = await self._get_cached_user_tags(user_id)
+        return cached[1] if cached else []
+
+    async def get_user_tag_names(self, user_id: int) -> dict[int, str]:
         """
-        async with self.pool.acquire() as conn:
-            try:
-                query = "SELECT id, name FROM tags WHERE user_id = $1 ORDER BY name"
-                records = await conn.fetch(query, user_id)
-                return [dict(record) for record in records]
-            except Exception as e:
-                logger.error("Error getting tags for user %s: %s", user_id, e)
-                return []
+        Get a user's tag names keyed by tag ID.
+
+        Shares the cache of get_user_tags, so calling both costs one query.
+
+        Args:
+            user_id: Telegram user ID
+
+        Returns:
+            Dict mapping tag ID to tag name
+        """
+        cached = await self._get_cached_user_tags(user_id)
+        return cached[2] if cached else {}
 
     async def add_tag(self, user_id: int, tag_name: str) -> int:
         """
@@ -319,28 +674,17 @@ class Database:
         Returns:
             int: ID of the tag
         """
-        async with self.pool.acquire() as conn:
-            try:
-                # Check if tag already exists
-                query = "SELECT id FROM tags WHERE user_id = $1 AND name = $2"
-                tag_id = await conn.fetchval(query, user_id, tag_name)
-
-                if tag_id:
-                    logger.info("Tag '%s' already exists for user %s", tag_name, user_id)
-                    return tag_id
-
-                # Create new tag
-                query = """
-                    INSERT INTO tags (user_id, name)
-                    VALUES ($1, $2)
-                    RETURNING id
-                """
-                tag_id = await conn.fetchval(query, user_id, tag_name)
-                logger.info("Created new tag '%s' (id=%s) for user %s", tag_name, tag_id, user_id)
-                return tag_id
-            except Exception as e:
-                logger.error("Error adding tag '%s' for user %s: %s", tag_name, user_id, e)
-                raise
+        try:
+            # Upsert: one round-trip whether or not the tag already exists
+            record = await self.pool.fetchrow(_ADD_TAG_SQL, user_id, tag_name)
+            tag_id = record["id"]
+            if record["inserted"]:
+                self._user_tags_cache.pop(user_id, None)
+            logger.info("Added tag '%s' (id=%s) for user %s", tag_name, tag_id, user_id)
+            return tag_id
+        except Exception as e:
+            logger.error("Error adding tag '%s' for user %s: %s", tag_name, user_id, e)
+            raise
 
     async def add_tag_to_content(self, content_id: int, tag_id: int) -> bool:
         """
@@ -353,83 +697,68 @@ class Database:
         Returns:
             bool: Success status
         """
-        async with self.pool.acquire() as conn:
-            try:
-                # Check if association already exists
-                check_query = """
-                    SELECT 1 FROM content_item_tags
-                    WHERE content_item_id = $1 AND tag_id = $2
-                """
-                exists = await conn.fetchval(check_query, content_id, tag_id)
-
-                if exists:
-                    logger.info("Tag (id=%s) already associated with content item %s", tag_id, content_id)
-                    return True
-
-                # Create association
-                query = """
-                    INSERT INTO content_item_tags (content_item_id, tag_id)
-                    VALUES ($1, $2)
-                """
-                await conn.execute(query, content_id, tag_id)
+        try:
+            user_id = await self.pool.fetchval(_ADD_TAG_TO_CONTENT_SQL, content_id, tag_id)
+            if user_id is None:
+                logger.info("Tag (id=%s) already associated with content item %s", tag_id, content_id)
+            else:
+                drop_prefetched_pages(user_id)
                 logger.info("Associated tag (id=%s) with content item %s", tag_id, content_id)
-                return True
-            except Exception as e:
-                logger.error("Error associating tag (id=%s) with content item %s: %s", tag_id, content_id, e)
-                return False
+            return True
+        except Exception as e:
+            logger.error("Error associating tag (id=%s) with content item %s: %s", tag_id, content_id, e)
+            return False
 
-    async def get_content_by_tags(self,
-                                  user_id: int,
-                                  tags: list[int],
-                                  relation: str = "and") -> list[Dict[str, Any]]:
+    async def add_tags_to_content(self, content_id: int, tag_ids: list[int]) -> bool:
         """
-        Get content items by tags.
+        Associate several tags with a content item in one batch.
 
         Args:
-            user_id: Telegram user ID
-            tags: List of tag IDs
-            relation: Relation between tags - "and" (all tags) or "or" (any tag)
+            content_id: Content item ID
+            tag_ids: List of tag IDs
 
         Returns:
-            List of content items
+            bool: Success status
         """
-        if not tags:
-            return []
+        if not tag_ids:
+            return True
+
+        try:
+            # One statement inserts all rows atomically, so no explicit
+            # BEGIN/COMMIT round-trips are needed
+            user_id = await self.pool.fetchval(_ADD_TAGS_TO_CONTENT_SQL, content_id, list(dict.fromkeys(tag_ids)))
+            if user_id is not None:
+                drop_prefetched_pages(user_id)
+            logger.info("Associated %s tags with content item %s", len(tag_ids), content_id)
+            return True
+        except Exception as e:
+            logger.error("Error associating tags %s with content item %s: %s", tag_ids, content_id, e)
+            return False
 
-        async with self.pool.acquire() as conn:
-            try:
-                if relation.lower() == "and":
-                    # Get items that have ALL the specified tags
-                    query = """
-                        SELECT ci.* FROM content_items ci
-                        WHERE ci.user_id = $1 AND ci.id IN (
-                            SELECT cit.content_item_id
-                            FROM content_item_tags cit
-                            WHERE cit.tag_id = ANY($2::int[])
-                            GROUP BY cit.content_item_id
-                            HAVING COUNT(DISTINCT cit.tag_id) = $3
-                        )
-                        ORDER BY ci.date_added DESC
-                    """
-                    records = await conn.fetch(query, user_id, tags, len(tags))
-                    logger.info("Retrieved %s content items with ALL tags %s for user %s",
-                                len(records), tags, user_id)
-                else:
-                    # Get items that have ANY of the specified tags
-                    query = """
-                        SELECT DISTINCT ci.* FROM content_items ci
-                        JOIN content_item_tags cit ON ci.id = cit.content_item_id
-                        WHERE ci.user_id = $1 AND cit.tag_id = ANY($2::int[])
-                        ORDER BY ci.date_added DESC
-                    """
-                    records = await conn.fetch(query, user_id, tags)
-                    logger.info("Retrieved %s content items with ANY tags %s for user %s",
-                                len(records), tags, user_id)
-
-                return [dict(record) for record in records]
-            except Exception as e:
-                logger.error("Error getting content by tags %s for user %s: %s", tags, user_id, e)
-                return []
+    async def attach_tag(self, user_id: int, content_id: int, tag_name: str) -> int:
+        """
+        Create a tag if needed and associate it with a content item.
+
+        Args:
+            user_id: Telegram user ID
+            content_id: Content item ID
+            tag_name: Name of the tag to attach
+
+        Returns:
+            int: ID of the tag
+        """
+        try:
+            record = await self.pool.fetchrow(_ATTACH_TAG_SQL, user_id, tag_name, content_id)
+            tag_id = record["id"]
+            if record["inserted"]:
+                self._user_tags_cache.pop(user_id, None)
+            drop_prefetched_pages(user_id)
+            logger.info("Attached tag '%s' (id=%s) to content item %s for user %s",
+                        tag_name, tag_id, content_id, user_id)
+            return tag_id
+        except Exception as e:
+            logger.error("Error attaching tag '%s' to content item %s: %s", tag_name, content_id, e)
+            raise
 
     # Statistics operations
 
@@ -443,66 +772,24 @@ class Database:
         Returns:
             Dict: Statistics data
         """
-        async with self.pool.acquire() as conn:
-            try:
-                stats = {}
-
-                # Total counts
-                count_query = """
-                    SELECT 
-                        COUNT(*) as total,
-                        COUNT(*) FILTER (WHERE status = 'unread') as unread,
-                        COUNT(*) FILTER (WHERE status = 'processed') as read
-                    FROM content_items 
-                    WHERE user_id = $1
-                """
-                counts = await conn.fetchrow(count_query, user_id)
-                stats["total"] = counts["total"]
-                stats["unread"] = counts["unread"]
-                stats["read"] = counts["read"]
-
-                # Read last week
-                week_query = """
-                    SELECT COUNT(*) 
-                    FROM content_items 
-                    WHERE user_id = $1 
-                      AND status = 'processed' 
-                      AND date_read > CURRENT_TIMESTAMP - INTERVAL '7 days'
-                """
-                stats["read_last_week"] = await conn.fetchval(week_query, user_id)
-
-                # Read last month
-                month_query = """
-                    SELECT COUNT(*) 
-                    FROM content_items 
-                    WHERE user_id = $1 
-                      AND status = 'processed' 
-                      AND date_read > CURRENT_TIMESTAMP - INTERVAL '30 days'
-                """
-                stats["read_last_month"] = await conn.fetchval(month_query, user_id)
-
-                # Content type distribution
-                type_query = """
-                    SELECT content_type, COUNT(*) 
-                    FROM content_items 
-                    WHERE user_id = $1 AND content_type IS NOT NULL
-                    GROUP BY content_type
-                """
-                type_records = await conn.fetch(type_query, user_id)
-                stats["content_types"] = {record["content_type"]: record["count"] for record in type_records}
-
-                logger.info("Retrieved statistics for user %s", user_id)
-                return stats
-            except Exception as e:
-                logger.error("Error getting statistics for user %s: %s", user_id, e)
-                return {"total": 0, "unread": 0, "read": 0, "read_last_week": 0, "read_last_month": 0}
+        try:
+            # Column names match the stats keys, so the row converts in one go
+            record = await self.pool.fetchrow(_USER_STATISTICS_SQL, user_id)
+            stats = dict(record.items())
+
+            logger.debug("Retrieved statistics for user %s", user_id)
+            return stats
+        except Exception as e:
+            logger.error("Error getting statistics for user %s: %s", user_id, e)
+            return {"total": 0, "unread": 0, "read": 0, "read_last_week": 0, "read_last_month": 0,
+                    "content_types": {}}
 
     async def get_user_content(self,
                                user_id: int,
                                limit: int = 100,
                                offset: int = 0,
                                content_type: str | None = None,
-                               status: str | None = None) -> list[Dict[str, Any]]:
+                               status: str | None = None) -> list[asyncpg.Record]:
         """
         Get all content items for a user, with unread items first,
         then read items, both sorted by date (newest first).
@@ -516,90 +803,28 @@ class Database:
             status: Optional filter by status ('unread' or 'processed')
 
         Returns:
-            List of content item dictionaries with tags
-        """
-        async with self.pool.acquire() as conn:
-            try:
-                # Build the query based on the provided filters
-                query_params = [user_id]
-                query_conditions = ["ci.user_id = $1"]
-
-                # Add content_type filter if provided
-                if content_type:
-                    query_params.append(content_type)
-                    query_conditions.append(f"ci.content_type = ${len(query_params)}")
-
-                # Add status filter if provided
-                if status:
-                    query_params.append(status)
-                    query_conditions.append(f"ci.status = ${len(query_params)}")
-
-                # Combine conditions
-                where_clause = " AND ".join(query_conditions)
-
-                # First, get the content items with pagination
-                items_query = f"""
-                    WITH paginated_items AS (
-                        SELECT * FROM content_items ci
-                        WHERE {where_clause}
-                        ORDER BY 
-                            CASE WHEN ci.status = 'unread' THEN 0 ELSE 1 END,
-                            ci.date_added DESC
-                        LIMIT ${len(query_params) + 1} OFFSET ${len(query_params) + 2}
-                    )
-                    SELECT * FROM paginated_items
-                """
-
-                # Add pagination parameters
-                query_params.extend([limit, offset])
-
-                # Execute the query to get content items
-                item_records = await conn.fetch(items_query, *query_params)
-
-                # Convert records to dictionaries
-                result = [dict(record) for record in item_records]
-
-                # If we have content items, get their tags
-                if result:
-                    # Extract content item IDs
-                    item_ids = [item["id"] for item in result]
-
-                    # Query to get tags for these content items
-                    tags_query = """
-                        SELECT cit.content_item_id, t.name
-                        FROM content_item_tags cit
-                        JOIN tags t ON cit.tag_id = t.id
-                        WHERE cit.content_item_id = ANY($1)
-                    """
-
-                    # Execute the query to get tags
-                    tag_records = await conn.fetch(tags_query, item_ids)
-
-                    # Create a dictionary to map content_item_id to list of tags
-                    item_tags = {}
-                    for record in tag_records:
-                        item_id = record["content_item_id"]
-                        tag_name = record["name"]
-
-                        if item_id not in item_tags:
-                            item_tags[item_id] = []
-
-                        item_tags[item_id].append(tag_name)
-
-                    # Add tags to each content item
-                    for item in result:
-                        item["tags"] = item_tags.get(item["id"], [])
-
-                logger.info("Retrieved %s content items with tags for user %s (limit=%s, offset=%s)",
-                            len(result), user_id, limit, offset)
-
-                return result
-
-            except Exception as e:
-                logger.error("Error getting content items for user %s: %s", user_id, e)
-                return []
-
-    async def get_tag_by_id(self, tag_id: int) -> Dict[str, Any] | None:
+            List of content item records, with "content" cut to
+            CONTENT_PREVIEW_LENGTH + 1 characters, a "tags" list of tag names
+            and the "total_count" of items matching the filters
+        """
+        try:
+            # One query returns the page of items together with their tags
+            query = _USER_CONTENT_SQL[(bool(content_type), bool(status))]
+            query_params = [user_id, *(param for param in (content_type, status) if param)]
+            query_params.extend([limit, offset])
+
+            records = await self.pool.fetch(query, *query_params)
+
+            logger.debug("Retrieved %s content items with tags for user %s (limit=%s, offset=%s)",
+                         len(records), user_id, limit, offset)
+
+            return records
+
+        except Exception as e:
+            logger.error("Error getting content items for user %s: %s", user_id, e)
+            return []
+
+    async def get_tag_by_id(self, tag_id: int) -> asyncpg.Record | None:
         """
         Get a tag by its ID.
 
@@ -607,29 +832,34 @@ class Database:
             tag_id: Tag ID
 
         Returns:
-            Dict or None: Tag data or None if not found
+            Record or None: Tag data or None if not found
         """
-        async with self.pool.acquire() as conn:
-            try:
-                query = "SELECT * FROM tags WHERE id = $1"
-                record = await conn.fetchrow(query, tag_id)
+        cached = self._tag_by_id_cache.get(tag_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
 
-                if record:
-                    logger.info("Retrieved tag with ID %s", tag_id)
-                    return dict(record)
+        try:
+            record = await self.pool.fetchrow(_GET_TAG_BY_ID_SQL, tag_id)
 
-                logger.warning("Tag with ID %s not found", tag_id)
-                return None
-            except Exception as e:
-                logger.error("Error getting tag with ID %s: %s", tag_id, e)
-                return None
+            if record:
+                logger.debug("Retrieved tag with ID %s", tag_id)
+                if len(self._tag_by_id_cache) >= _TAG_BY_ID_CACHE_MAX_SIZE:
+                    self._tag_by_id_cache.clear()
+                self._tag_by_id_cache[tag_id] = (time.monotonic() + _TAG_BY_ID_CACHE_TTL, record)
+                return record
+
+            logger.warning("Tag with ID %s not found", tag_id)
+            return None
+        except Exception as e:
+            logger.error("Error getting tag with ID %s: %s", tag_id, e)
+            return None
 
     async def get_content_by_tags(self,
                                   user_id: int,
                                   tags: list[int],
                                   relation: str = "and",
                                   limit: int = 100,
-                                  offset: int = 0) -> list[Dict[str, Any]]:
+                                  offset: int = 0) -> list[asyncpg.Record]:
         """
         Get content items by tags with pagination support.
 
@@ -641,91 +871,33 @@ class Database:
             offset: Offset for pagination
 
         Returns:
-            List of content items
+            List of content item records, with "content" cut to
+            CONTENT_PREVIEW_LENGTH + 1 characters, a "tags" list of tag names
+            and the "total_count" of items matching the tags
         """
         if not tags:
             return []
 
-        async with self.pool.acquire() as conn:
-            try:
-                if relation.lower() == "and":
-                    # Get items that have ALL the specified tags
-                    query = """
-                            WITH filtered_items AS (
-                                SELECT ci.* FROM content_items ci
-                                WHERE ci.user_id = $1 AND ci.id IN (
-                                    SELECT cit.content_item_id
-                                    FROM content_item_tags cit
-                                    WHERE cit.tag_id = ANY($2::int[])
-                                    GROUP BY cit.content_item_id
-                                    HAVING COUNT(DISTINCT cit.tag_id) = $3
-                                )
-                            )
-                            SELECT * FROM filtered_items
-                            ORDER BY 
-                                CASE WHEN status = 'unread' THEN 0 ELSE 1 END,
-                                date_added DESC
-                            LIMIT $4 OFFSET $5
-                        """
-                    records = await conn.fetch(query, user_id, tags, len(tags), limit, offset)
-                    logger.info("Retrieved %s content items with ALL tags %s for user %s (limit=%s, offset=%s)",
-                                len(records), tags, user_id, limit, offset)
-                else:
-                    # Get items that have ANY of the specified tags
-                    query = """
-                            WITH filtered_items AS (
-                                SELECT DISTINCT ci.* FROM content_items ci
-                                JOIN content_item_tags cit ON ci.id = cit.content_item_id
-                                WHERE ci.user_id = $1 AND cit.tag_id = ANY($2::int[])
-                            )
-                            SELECT * FROM filtered_items
-                            ORDER BY 
-                                CASE WHEN status = 'unread' THEN 0 ELSE 1 END,
-                                date_added DESC
-                            LIMIT $3 OFFSET $4
-                        """
-                    records = await conn.fetch(query, user_id, tags, limit, offset)
-                    logger.info("Retrieved %s content items with ANY tags %s for user %s (limit=%s, offset=%s)",
-                                len(records), tags, user_id, limit, offset)
-
-                # Convert records to dictionaries
-                result = [dict(record) for record in records]
-
-                # If we have content items, get their tags
-                if result:
-                    # Extract content item IDs
-                    item_ids = [item["id"] for item in result]
-
-                    # Query to get tags for these content items
-                    tags_query = """
-                            SELECT cit.content_item_id, t.name
-                            FROM content_item_tags cit
-                            JOIN tags t ON cit.tag_id = t.id
-                            WHERE cit.content_item_id = ANY($1)
-                        """
-
-                    # Execute the query to get tags
-                    tag_records = await conn.fetch(tags_query, item_ids)
-
-                    # Create a dictionary to map content_item_id to list of tags
-                    item_tags = {}
-                    for record in tag_records:
-                        item_id = record["content_item_id"]
-                        tag_name = record["name"]
-
-                        if item_id not in item_tags:
-                            item_tags[item_id] = []
-
-                        item_tags[item_id].append(tag_name)
-
-                    # Add tags to each content item
-                    for item in result:
-                        item["tags"] = item_tags.get(item["id"], [])
-
-                return result
-            except Exception as e:
-                logger.error("Error getting content by tags %s for user %s: %s", tags, user_id, e)
-                return []
+        try:
+            if relation.lower() == "and":
+                # Get items that have ALL the specified tags
+                records = await self.pool.fetch(
+                    _CONTENT_BY_ALL_TAGS_SQL, user_id, tags, len(tags), limit, offset
+                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Retrieved %s content items with ALL tags %s for user %s (limit=%s, offset=%s)",
+                                 len(records), tags, user_id, limit, offset)
+            else:
+                # Get items that have ANY of the specified tags
+                records = await self.pool.fetch(_CONTENT_BY_ANY_TAGS_SQL, user_id, tags, limit, offset)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Retrieved %s content items with ANY tags %s for user %s (limit=%s, offset=%s)",
+                                 len(records), tags, user_id, limit, offset)
+
+            return records
+        except Exception as e:
+            logger.error("Error getting content by tags %s for user %s: %s", tags, user_id, e)
+            return []
 
 
 # Create a singleton instance
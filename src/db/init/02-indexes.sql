@@ -0,0 +1,16 @@
+-- Composite index for the per-user hot paths: filters on (user_id, status,
+-- content_type) and "latest first" ordering by date_added.
+-- CONCURRENTLY lets this file be applied to a live database with psql as well.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_items_user_status_type_date
+    ON content_items(user_id, status, content_type, date_added DESC);
+
+-- Status filter without a content type: /last on unread items, the paged
+-- unread list and the unread random pick. The index above needs its
+-- content_type column pinned before date_added can be read in order.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_items_user_status_date
+    ON content_items(user_id, status, date_added DESC);
+
+-- Unread-first listing for /all: ORDER BY (status <> 'unread'), date_added DESC
+-- over all of a user's items, read straight from the index for LIMIT/OFFSET pages.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_items_user_unread_first_date
+    ON content_items(user_id, (status <> 'unread'), date_added DESC);
@@ -0,0 +1,90 @@
+"""
+Prefetched list pages for the ReadLater bot.
+
+Once a page of a user's materials list is shown, the next one is fetched in
+the background, so "next" usually finds its rows ready. The Database write
+methods drop the user's prefetched pages on every change made by the bot
+(adds, types, tags, statuses); the short TTL bounds staleness from changes
+made elsewhere.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Hashable
+
+_PREFETCH_TTL = 30.0
+_PREFETCH_MAX_TASKS = 32
+_PREFETCH_MAX_USERS = 10_000
+
+# user_id -> {page key: (expiry time, fetch task)}, least recently prefetched
+# user first; the bot runs on a single event loop, so no locking is needed
+_prefetched_pages: dict[int, dict[Hashable, tuple[float, asyncio.Task]]] = {}
+# Running fetches, referenced so they aren't garbage collected mid-flight
+_prefetch_tasks: set[asyncio.Task] = set()
+
+
+def prefetch_page(user_id: int, key: Hashable, fetch: Callable[[], Awaitable]) -> None:
+    """
+    Start fetching a page in the background for a later take_prefetched_page.
+
+    Nothing is started while too many fetches are already running.
+
+    Args:
+        user_id: Telegram user ID
+        key: Identifies the page among the user's prefetched pages
+        fetch: Starts the query for the page
+    """
+    if len(_prefetch_tasks) >= _PREFETCH_MAX_TASKS:
+        return
+
+    # Re-inserted, so the user moves to the end of the eviction order
+    pages = _prefetched_pages.pop(user_id, None) or {}
+    if len(_prefetched_pages) >= _PREFETCH_MAX_USERS:
+        _evict_prefetched_pages()
+
+    task = asyncio.ensure_future(fetch())
+    _prefetch_tasks.add(task)
+    task.add_done_callback(_prefetch_tasks.discard)
+    pages[key] = (time.monotonic() + _PREFETCH_TTL, task)
+    _prefetched_pages[user_id] = pages
+
+
+def _evict_prefetched_pages() -> None:
+    """Drop the users whose prefetched pages all expired, or else the least recently prefetched one."""
+    now = time.monotonic()
+    expired = [user_id for user_id, pages in _prefetched_pages.items()
+               if all(expiry <= now for expiry, _ in pages.values())]
+    for user_id in expired:
+        del _prefetched_pages[user_id]
+    if not expired:
+        del _prefetched_pages[next(iter(_prefetched_pages))]
+
+
+def take_prefetched_page(user_id: int, key: Hashable) -> asyncio.Task | None:
+    """
+    Return the fresh prefetch of a page, if any, removing it from the cache.
+
+    Args:
+        user_id: Telegram user ID
+        key: Page key passed to prefetch_page
+
+    Returns:
+        Task or None: The fetch task, or None if the page wasn't prefetched
+        or its prefetch expired
+    """
+    pages = _prefetched_pages.get(user_id)
+    if not pages:
+        return None
+    expiry, task = pages.pop(key, (0.0, None))
+    if task is None or expiry <= time.monotonic():
+        return None
+    return task
+
+
+def drop_prefetched_pages(user_id: int) -> None:
+    """
+    Forget the user's prefetched pages after their materials changed.
+
+    Args:
+        user_id: Telegram user ID
+    """
+    _prefetched_pages.pop(user_id, None)
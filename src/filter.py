@@ -7,6 +7,13 @@ from aiogram.fsm.context import FSMContext
 
 from src.states import ContentItemStates, GetTagStates
 
+# State names as stored by FSM storage, so the checks below are plain str
+# comparisons instead of State.__eq__ calls
+_WAITING_FOR_TAG = ContentItemStates.waiting_for_tag.state
+
+# States that consume every text message themselves
+_TEXT_INPUT_STATES = frozenset({GetTagStates.waiting_for_tag_selection.state})
+
 
 class NotCommandFilter(BaseFilter):
     """
@@ -30,29 +37,35 @@ class NotCommandFilter(BaseFilter):
         Returns:
             bool: True if the message should be treated as new content
         """
-        # First check if it's a command - if so, don't process as content
-        if message.text and message.text.startswith('/'):
+        # First check if it's a command - if so, don't process as content.
+        # Done before any FSM storage access, so commands never touch it.
+        text = message.text
+        if text and text[0] == '/':
             return False
 
-        # Get current state and state data
         current_state = await state.get_state()
-        state_data = await state.get_data()
+
+        # Nothing in progress: plain new content, no further storage reads
+        if current_state is None:
+            return True
 
         # Special case 1: If we're explicitly waiting for new tag input,
-        # don't treat as new content
-        if current_state == ContentItemStates.waiting_for_tag and state_data.get("waiting_for_new_tag", False):
-            return False
-            
-        # Special case 2: If we're in tag selection mode for filtering,
-        # don't treat as new content
-        if current_state == GetTagStates.waiting_for_tag_selection:
+        # don't treat as new content. Only this state needs the state data,
+        # and media without text can't be a tag name, so it skips the read.
+        if text is not None and current_state == _WAITING_FOR_TAG:
+            state_data = await state.get_data()
+            if state_data.get("waiting_for_new_tag", False):
+                return False
+
+        # Special case 2: If we're in a state that takes text input itself
+        # (tag selection mode for filtering), don't treat as new content
+        if current_state in _TEXT_INPUT_STATES:
             return False
 
         # For all other states, even if we're in a flow (waiting for button press),
         # treat text messages as new content and interrupt the current flow
-        if current_state:
-            # Clear the current state so we can start fresh with the new content
-            await state.clear()
+        # Clear the current state so we can start fresh with the new content
+        await state.clear()
 
         # Message should be treated as new content
         return True
\ No newline at end of file
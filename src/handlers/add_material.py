@@ -2,13 +2,14 @@
 Handlers for adding new materials.
 """
 
+import asyncio
 import logging
-import re
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 
+from src.callbacks import ContentTypeCallback, TagCallback, TagPageCallback
 from src.filter import NotCommandFilter
 from src.states import ContentItemStates
 from src.keyboards.inline import get_content_type_keyboard, get_tags_keyboard
@@ -18,8 +19,34 @@ import src.text as text
 router = Router()
 logger = logging.getLogger(__name__)
 
-# Simple URL detection regex
-URL_PATTERN = re.compile(r'https?://\S+')
+# The content type keyboard has no per-user data, so it is built once
+_CONTENT_TYPE_KEYBOARD = get_content_type_keyboard()
+
+# Simple URL detection: an http(s) scheme followed by non-whitespace
+URL_SCHEMES = ("http://", "https://")
+
+
+def find_url(message_text: str) -> str | None:
+    """
+    Find the first http(s) URL in a text.
+
+    Plain substring scans instead of a regex: most messages have no "http" at
+    all, and the find fails fast in C.
+
+    Args:
+        message_text: Text to search
+
+    Returns:
+        str or None: The URL up to the next whitespace, or None if not found
+    """
+    start = message_text.find("http")
+    while start != -1:
+        if message_text.startswith(URL_SCHEMES, start):
+            url = message_text[start:].split(None, 1)[0]
+            if url not in URL_SCHEMES:
+                return url
+        start = message_text.find("http", start + 4)
+    return None
 
 
 @router.message(NotCommandFilter())
@@ -37,73 +64,88 @@ async def process_any_message(message: Message, state: FSMContext) -> None:
     user_id = message.from_user.id
     username = message.from_user.username or f"user_{user_id}"
 
-    # Extract content information
-    content = message.text or message.caption or ""
-    source = f"@{username}"
-
-    # Log additional info for different message types
-    if message.forward_from or message.forward_sender_name or message.forward_from_chat:
-        logger.info("User %s forwarded a message to the collection", user_id)
-        if message.forward_from_chat:
-            source = f"@{message.forward_from_chat.username or 'channel'}"
-            # Store the chat username if available (for public channels)
-            channel_username = message.forward_from_chat.username
-    else:
-        logger.info("User %s sent a message to the collection", user_id)
-
-    # Log URLs if found
-    if message.text and URL_PATTERN.search(message.text):
-        url = URL_PATTERN.search(message.text).group(0)
-        logger.info("Found URL in message: %s", url)
+    # Extract content information; message fields are read once into locals
+    message_text = message.text
+    content = message_text or message.caption or ""
+    forward_chat = message.forward_from_chat
+
+    # Log additional info for different message types; skipped entirely,
+    # including the URL scan, when INFO records would be dropped anyway
+    if logger.isEnabledFor(logging.INFO):
+        if forward_chat or message.forward_from or message.forward_sender_name:
+            logger.info("User %s forwarded a message to the collection", user_id)
+        else:
+            logger.info("User %s sent a message to the collection", user_id)
+
+        # Log URLs if found
+        if message_text:
+            url = find_url(message_text)
+            if url:
+                logger.info("Found URL in message: %s", url)
 
     # Save material in database immediately
     try:
         # Extract message and chat ID for forwarded content
         message_id = None
         chat_id = None
-        if message.forward_from_chat:
+        if forward_chat:
             logger.info("Is forwarded from chat")
             message_id = message.forward_from_message_id
-            chat_id = message.forward_from_chat.id
+            chat_id = forward_chat.id
 
             # If it's a channel and has a username, store source as the username
-            if message.forward_from_chat.username:
-                source = f"@{message.forward_from_chat.username}"
+            channel_username = forward_chat.username
+            if channel_username:
+                source = f"@{channel_username}"
             # For private channels, we use the ID with -100 prefix
             else:
                 source = f"channel_{chat_id}"
+        else:
+            source = f"@{username}"
 
         logger.info("Retrieved source info: message_id=%s, chat_id=%s, source=%s", message_id, chat_id, source)
+        # The confirmation doesn't need the content ID, so send it while the
+        # insert is in flight instead of after it
+        ack_task = asyncio.ensure_future(message.answer(text.material_received_msg))
+
         # Add content to database
-        content_id = await db.add_content_item(
-            user_id=user_id,
-            content=content,
-            source=source,
-            message_id=message_id,
-            chat_id=chat_id
+        try:
+            content_id = await db.add_content_item(
+                user_id=user_id,
+                content=content,
+                source=source,
+                message_id=message_id,
+                chat_id=chat_id
+            )
+        except Exception:
+            # Keep the confirmation ahead of the error message
+            await asyncio.gather(ack_task, return_exceptions=True)
+            raise
+
+        # Store content_id in FSM state and set it to waiting for content type.
+        # Both are done before the keyboard goes out, since its callback reads them.
+        await asyncio.gather(
+            ack_task,
+            state.update_data(content_id=content_id),
+            state.set_state(ContentItemStates.waiting_for_content_type),
         )
 
-        # Store content_id in FSM state
-        await state.update_data(content_id=content_id)
-
-        # Send confirmation and ask for content type
-        await message.answer(text.material_received_msg)
+        # Ask for content type
         await message.answer(
             text.ask_content_type_msg,
-            reply_markup=get_content_type_keyboard()
+            reply_markup=_CONTENT_TYPE_KEYBOARD
         )
 
-        # Set state to waiting for content type
-        await state.set_state(ContentItemStates.waiting_for_content_type)
-
     except Exception as e:
         logger.error("Failed to save content for user %s: %s", user_id, e)
         # Notify user of error but don't reveal technical details
         await message.answer("Произошла ошибка при сохранении. Пожалуйста, попробуйте позже.")
 
 
-@router.callback_query(F.data.startswith("content_type:"))
-async def process_content_type(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(ContentTypeCallback.filter())
+async def process_content_type(callback: CallbackQuery,
+                               callback_data: ContentTypeCallback,
+                               state: FSMContext) -> None:
     """
     Process content type selection.
 
@@ -112,13 +154,12 @@ async def process_content_type(callback: CallbackQuery, state: FSMContext) -> No
 
     Args:
         callback: Callback query from inline keyboard
+        callback_data: Parsed content type selection
         state: FSM context to track conversation state
     """
     # Get user ID
     user_id = callback.from_user.id
-
-    # Parse content type from callback data
-    _, content_type = callback.data.split(":", 1)
+    content_type = callback_data.content_type
 
     # First, check if we have content_id in state
     state_data = await state.get_data()
@@ -130,22 +171,28 @@ async def process_content_type(callback: CallbackQuery, state: FSMContext) -> No
         return
 
     try:
+        # The type update, the confirmation edit and the tag lookup for the
+        # tag selection keyboard don't depend on each other, so they overlap
         if content_type != "skip":
-            # Update content type in database
-            await db.update_content_type(content_id, content_type)
-            logger.info("Updated content type to '%s' for item %s", content_type, content_id)
-
-            # Confirm content type selection
+            # Update content type in database and confirm content type selection
             content_type_name = text.text_type_msg if content_type == "text" else text.video_type_msg
-            await callback.message.edit_text(
-                text.content_type_selected_msg.format(content_type=content_type_name)
+            _, _, user_tags = await asyncio.gather(
+                db.update_content_type(content_id, content_type),
+                callback.message.edit_text(
+                    text.content_type_selected_msg.format(content_type=content_type_name)
+                ),
+                db.get_user_tags(user_id),
             )
+            logger.info("Updated content type to '%s' for item %s", content_type, content_id)
         else:
             logger.info("User %s skipped content type selection", user_id)
-            await callback.message.edit_text(text.content_skipped_msg)
+            _, user_tags = await asyncio.gather(
+                callback.message.edit_text(text.content_skipped_msg),
+                db.get_user_tags(user_id),
+            )
 
-        # Get user tags for the tag selection keyboard
-        user_tags = await db.get_user_tags(user_id)
+        # Update state to waiting for tag before its keyboard can be pressed
+        await state.set_state(ContentItemStates.waiting_for_tag)
 
         # Ask for tags
         await callback.message.answer(
@@ -153,9 +200,6 @@ async def process_content_type(callback: CallbackQuery, state: FSMContext) -> No
             reply_markup=get_tags_keyboard(user_tags)
         )
 
-        # Update state to waiting for tag
-        await state.set_state(ContentItemStates.waiting_for_tag)
-
     except Exception as e:
         logger.error("Error processing content type for user %s: %s", user_id, e)
         await callback.answer("Произошла ошибка. Пожалуйста, попробуйте позже.")
@@ -164,8 +208,10 @@ async def process_content_type(callback: CallbackQuery, state: FSMContext) -> No
     await callback.answer()
 
 
-@router.callback_query(ContentItemStates.waiting_for_tag, F.data.startswith("tag:"))
-async def process_tag_selection(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(ContentItemStates.waiting_for_tag, TagCallback.filter())
+async def process_tag_selection(callback: CallbackQuery,
+                                callback_data: TagCallback,
+                                state: FSMContext) -> None:
     """
     Process tag selection or 'add new tag' / 'skip' options.
 
@@ -174,6 +220,7 @@ async def process_tag_selection(callback: CallbackQuery, state: FSMContext) -> N
 
     Args:
         callback: Callback query from inline keyboard
+        callback_data: Parsed tag button (tag ID, 'new' or 'skip')
         state: FSM context to track conversation state
     """
     user_id = callback.from_user.id
@@ -187,17 +234,17 @@ async def process_tag_selection(callback: CallbackQuery, state: FSMContext) -> N
         await callback.answer("Это сообщение устарело. Пожалуйста, используйте кнопки из последнего сообщения.")
         return
 
-    # Parse tag action from callback data
-    _, tag_data = callback.data.split(":", 1)
+    tag_data = callback_data.value
 
+    # The callback is answered exactly once, in the finally block below
+    answer_text = None
     try:
         if tag_data == "new":
             # User wants to add a new tag
             await callback.message.edit_text(text.new_tag_prompt_msg)
-            # Keep the same state, but set a flag to indicate we're waiting for a new tag name
+            # Keep the same state, but set a flag to indicate we're waiting for a new tag name.
+            # The handler only runs in waiting_for_tag, so the state itself needs no write.
             await state.update_data(waiting_for_new_tag=True)
-            await state.set_state(ContentItemStates.waiting_for_tag)  # Ensure we're in the correct state
-            await callback.answer()
             return
 
         if tag_data == "skip":
@@ -207,26 +254,25 @@ async def process_tag_selection(callback: CallbackQuery, state: FSMContext) -> N
             await callback.message.answer(text.material_saved_msg)
             # Clear state as we're done with this material
             await state.clear()
-            await callback.answer()
             return
 
         # User selected an existing tag
         tag_id = int(tag_data)
 
-        # Add tag to content
-        await db.add_tag_to_content(content_id, tag_id)
+        # Add tag to content while getting the tags for the keyboard
+        _, user_tags = await asyncio.gather(
+            db.add_tag_to_content(content_id, tag_id),
+            db.get_user_tags(user_id),
+        )
 
-        # Get tag name for confirmation
-        user_tags = await db.get_user_tags(user_id)
-        tag_name = next((tag['name'] for tag in user_tags if tag['id'] == tag_id), "Выбранный тег")
+        # Get tag name for confirmation (served from the cache just filled)
+        tag_names = await db.get_user_tag_names(user_id)
+        tag_name = tag_names.get(tag_id, "Выбранный тег")
 
         logger.info("Added tag '%s' to content %s for user %s", tag_name, content_id, user_id)
 
         # Confirm tag addition
-        await callback.answer(f"Тег '{tag_name}' добавлен")
-
-        # Set state to ensure we're in the right state
-        await state.set_state(ContentItemStates.waiting_for_tag)
+        answer_text = f"Тег '{tag_name}' добавлен"
 
         # Update keyboard to show the latest tags
         await callback.message.edit_text(
@@ -236,7 +282,9 @@ async def process_tag_selection(callback: CallbackQuery, state: FSMContext) -> N
 
     except Exception as e:
         logger.error("Error processing tag selection for user %s: %s", user_id, e)
-        await callback.answer("Произошла ошибка. Пожалуйста, попробуйте позже.")
+        answer_text = "Произошла ошибка. Пожалуйста, попробуйте позже."
+    finally:
+        await callback.answer(answer_text)
 
 
 @router.message(ContentItemStates.waiting_for_tag)
@@ -275,22 +323,19 @@ async def process_new_tag(message: Message, state: FSMContext) -> None:
         return
 
     try:
-        # Add tag to database
-        tag_id = await db.add_tag(user_id, tag_name)
-
-        # Add tag to content
-        await db.add_tag_to_content(content_id, tag_id)
+        # Create the tag (or reuse an existing one) and add it to content
+        await db.attach_tag(user_id, content_id, tag_name)
 
         logger.info("Created and added new tag '%s' to content %s for user %s", tag_name, content_id, user_id)
 
-        # Confirm tag addition
-        await message.answer(text.tag_selected_msg.format(tag_name=tag_name))
-
-        # Reset the waiting_for_new_tag flag
-        await state.update_data(waiting_for_new_tag=False)
-
-        # Get user tags for the updated keyboard
-        user_tags = await db.get_user_tags(user_id)
+        # Confirm tag addition, reset the waiting_for_new_tag flag and get
+        # user tags for the updated keyboard; the tag list is read after
+        # attach_tag, so it includes the new tag
+        _, _, user_tags = await asyncio.gather(
+            message.answer(text.tag_selected_msg.format(tag_name=tag_name)),
+            state.update_data(waiting_for_new_tag=False),
+            db.get_user_tags(user_id),
+        )
 
         # Ask if user wants to add more tags
         await message.answer(
@@ -303,28 +348,28 @@ async def process_new_tag(message: Message, state: FSMContext) -> None:
         await message.answer("Произошла ошибка при добавлении тега. Пожалуйста, попробуйте позже.")
 
 
-@router.callback_query(ContentItemStates.waiting_for_tag, F.data.startswith("page:"))
-async def process_tag_pagination(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(ContentItemStates.waiting_for_tag, TagPageCallback.filter())
+async def process_tag_pagination(callback: CallbackQuery,
+                                 callback_data: TagPageCallback,
+                                 state: FSMContext) -> None:
     """
     Handle pagination for the tag selection keyboard during content addition.
     Only triggers when in the ContentItemStates.waiting_for_tag state.
 
     Args:
         callback: Callback query from inline keyboard
+        callback_data: Parsed page navigation button
         state: FSM context to track conversation state
     """
     user_id = callback.from_user.id
 
     # Check if this is just the current page indicator (not a navigation button)
-    if callback.data == "page:current":
+    if callback_data.page == "current":
         await callback.answer()
         return
 
-    # Get the page number from the callback data
-    _, page_str = callback.data.split(":", 1)
-
     try:
-        page = int(page_str)
+        page = int(callback_data.page)
 
         # Get user tags for the updated keyboard
         user_tags = await db.get_user_tags(user_id)
@@ -334,12 +379,7 @@ async def process_tag_pagination(callback: CallbackQuery, state: FSMContext) ->
             reply_markup=get_tags_keyboard(user_tags, page=page)
         )
 
-        # Make sure we're still in the right state
-        current_state = await state.get_state()
-        if current_state != ContentItemStates.waiting_for_tag:
-            await state.set_state(ContentItemStates.waiting_for_tag)
-
-        logger.info("User %s navigated to tag page %s during content addition", user_id, page)
+        logger.debug("User %s navigated to tag page %s during content addition", user_id, page)
 
     except Exception as e:
         logger.error("Error processing tag pagination for user %s: %s", user_id, e)
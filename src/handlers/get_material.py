@@ -5,13 +5,18 @@ These handlers allow users to retrieve content items from their collection
 based on different criteria (last added or random unread).
 """
 
+import asyncio
 import logging
+from functools import lru_cache, partial
+from typing import Awaitable
+from asyncpg import Record
 from aiogram import Router, F
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
-import re
 
-from src.db.database import db
+from src.db.database import db, CONTENT_PREVIEW_LENGTH
+from src.db.prefetch import prefetch_page, take_prefetched_page
 import src.text as text
 from src.keyboards.inline import get_status_update_keyboard
 
@@ -21,32 +26,70 @@ logger = logging.getLogger(__name__)
 # Constants for pagination
 ITEMS_PER_PAGE = 12
 
+# Content starting with one of these is shown as a plain link
+_HTTP_PREFIXES = ('http://', 'https://')
 
-async def send_material_info(message: Message, content_item: dict) -> None:
+# Channel and supergroup IDs are -(10**12 + id), shown as "-100<id>"
+_CHANNEL_ID_OFFSET = 10**12
+
+# Material list headers
+_UNREAD_LIST_HEADER = "📚 Ваши непрочитанные материалы"
+_ALL_LIST_HEADER = "📚 Ваши сохраненные материалы"
+
+# Display names of content statuses; anything but 'processed' shows as unread
+_STATUS_NAMES = {"processed": "Прочитано", "unread": "Не прочитано"}
+
+# Backslash-escapes every special Markdown character: _*[]()~`>#+-=|{}.!
+_MARKDOWN_ESCAPE = str.maketrans({char: "\\" + char for char in "_*[]()~`>#+-=|{}.!"})
+
+# Telegram rejects messages over 4096 characters (counted in UTF-16 units
+# after Markdown parsing); long lists are split below this to leave headroom
+_MESSAGE_SPLIT_LENGTH = 4000
+
+# Status presses on one item within this many seconds collapse into one update
+_STATUS_DEBOUNCE_DELAY = 0.3
+
+# (user_id, content_id) -> (flush timer, latest requested status, material message)
+_pending_status_updates: dict[tuple[int, int], tuple[asyncio.TimerHandle, str, Message]] = {}
+# (user_id, content_id) -> running flush, referenced so it isn't garbage
+# collected mid-flight and so reads can wait for it
+_status_flush_tasks: dict[tuple[int, int], asyncio.Task] = {}
+
+
+@lru_cache(maxsize=4096)
+def _escape_tag(tag: str) -> str:
+    """Escape a tag name for Markdown; tag names repeat across every page, so each is escaped once."""
+    return tag.translate(_MARKDOWN_ESCAPE)
+
+
+def format_material_info(content_item: Record) -> tuple[str, InlineKeyboardMarkup]:
     """
-    Format and send material information to the user.
+    Format material information for display.
 
     Args:
-        message: The original command message
-        content_item: Content item data from the database
+        content_item: Content item record from the database
+
+    Returns:
+        tuple: HTML message text and the status update keyboard
     """
     # Extract content information
     content_id = content_item["id"]
     content = content_item["content"]
     content_type = content_item["content_type"] or "Не указан"
     date_added = content_item["date_added"].strftime("%d.%m.%Y %H:%M")
-    status = "Прочитано" if content_item["status"] == "processed" else "Не прочитано"
+    status = _STATUS_NAMES.get(content_item["status"], _STATUS_NAMES["unread"])
 
     # Check if this is a forwarded message and create a link if possible
     message_link = None
     message_id = content_item.get("message_id")
     chat_id = content_item.get("chat_id")
-    logger.info("Message ID: %s, Chat ID: %s", message_id, chat_id)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Message ID: %s, Chat ID: %s", message_id, chat_id)
     if message_id and chat_id:
         # For private chats/channels, Telegram API adds -100 prefix to chat_id
-        # We need to strip it for the link
-        if str(chat_id).startswith('-100'):
-            chat_id_for_link = str(chat_id)[4:]  # Remove '-100' prefix
+        # (i.e. -1e12 - id); we need to strip it for the link
+        if chat_id < -_CHANNEL_ID_OFFSET:
+            chat_id_for_link = -chat_id - _CHANNEL_ID_OFFSET  # Remove '-100' prefix
             message_link = f"https://t.me/c/{chat_id_for_link}/{message_id}"
         else:
             # For public chats, we'd need the username which we don't have stored
@@ -54,34 +97,89 @@ async def send_material_info(message: Message, content_item: dict) -> None:
             message_link = f"https://t.me/{chat_id}/{message_id}"
 
     # If the content is a URL, use it directly
-    if content and (content.startswith('http://') or content.startswith('https://')):
+    if content and content.startswith(_HTTP_PREFIXES):
         display_content = content  # The URL will be displayed as is and clickable
     else:
         # For text content or forwarded messages with a message link
 
-        display_content = content
         if message_link:
-            display_content = content[:500] + "..."
-            display_content += f"\n\n<a href='{message_link}'>➡️ Перейти к оригиналу</a>"
+            preview = content if len(content) <= 500 else content[:500] + "..."
+            display_content = f"{preview}\n\n<a href='{message_link}'>➡️ Перейти к оригиналу</a>"
+        else:
+            display_content = content
 
     # Format the message
-    response = text.material_info_template.format(
+    response = text.build_material_info(
         content=display_content,
         content_type=content_type,
         date_added=date_added,
         status=status
     )
 
+    return response, get_status_update_keyboard(content_id)
+
+
+async def send_material_info(message: Message, content_item: Record) -> None:
+    """
+    Format and send material information to the user.
+
+    Args:
+        message: The original command message
+        content_item: Content item record from the database
+    """
+    response, keyboard = format_material_info(content_item)
+
     # Send the message with status update buttons
     await message.answer(
         response,
-        reply_markup=get_status_update_keyboard(content_id),
+        reply_markup=keyboard,
         disable_web_page_preview=False,  # Enable link previews
         parse_mode="HTML"  # Use HTML parse mode
     )
 
 
-def create_materials_keyboard(items, current_page, filter_type="status", status=None, tag_id=None):
+async def edit_material_info(message: Message, content_item: Record) -> None:
+    """
+    Replace a material message with the item's current information.
+
+    Edits the message in place; if Telegram refuses the edit, the message is
+    deleted and sent again instead.
+
+    Args:
+        message: The material message to update
+        content_item: Content item record from the database
+    """
+    response, keyboard = format_material_info(content_item)
+
+    try:
+        await message.edit_text(
+            response,
+            reply_markup=keyboard,
+            disable_web_page_preview=False,
+            parse_mode="HTML"
+        )
+    except TelegramBadRequest as e:
+        # Pressing the button for the status the item already has
+        if "message is not modified" in e.message:
+            return
+        logger.warning("Could not edit material message, sending it again: %s", e)
+        await asyncio.gather(
+            message.delete(),
+            send_material_info(message, content_item),
+        )
+
+
+@lru_cache(maxsize=256)
+def _page_indicator_button(page: int, total_pages: int | None) -> InlineKeyboardButton:
+    """Return the page indicator button of the materials list; it only depends on the page numbers."""
+    return InlineKeyboardButton(
+        text=f"📄 {page+1}/{total_pages}" if total_pages else f"📄 {page+1}",
+        callback_data="current_page"
+    )
+
+
+def create_materials_keyboard(items, current_page, filter_type="status", status=None, tag_id=None,
+                              total_pages=None):
     """
     Create an inline keyboard with numbered buttons for each item
     and navigation buttons.
@@ -92,68 +190,100 @@ def create_materials_keyboard(items, current_page, filter_type="status", status=
         filter_type: Type of filter being applied ('status' or 'tag')
         status: Optional status filter to preserve during navigation
         tag_id: Optional tag ID filter to preserve during navigation
+        total_pages: Optional number of pages, shown in the page indicator
 
     Returns:
         InlineKeyboardMarkup: Keyboard with item buttons and navigation
     """
-    # Create numbered buttons for each item
-    item_buttons = []
+    # Create numbered buttons for each item, straight into rows of 6
+    keyboard = []
     for idx, item in enumerate(items, start=1):
-        item_buttons.append(InlineKeyboardButton(
+        if idx % 6 == 1:
+            keyboard.append([])
+        keyboard[-1].append(InlineKeyboardButton(
             text=str(idx),  # Simply use sequential numbers starting from 1
             callback_data=f"view:{item['id']}"
         ))
 
-    # Navigation buttons with appropriate filter parameters
+    # Navigation buttons with appropriate filter parameters: the filter is
+    # the same for both directions, so only the page number is filled in per
+    # button ("tag_list_page:<page>:<tag_id>" or "list_page:<page>[:<status>]")
     nav_buttons = []
+    if filter_type == "tag" and tag_id is not None:
+        nav_data = f"tag_list_page:{{}}:{tag_id}"
+    elif status:
+        nav_data = f"list_page:{{}}:{status}"
+    else:
+        nav_data = "list_page:{}"
 
     # Previous page button (if not on first page)
     if current_page > 0:
-        if filter_type == "tag" and tag_id is not None:
-            callback_data = f"tag_list_page:{current_page-1}:{tag_id}"
-        else:
-            callback_data = f"list_page:{current_page-1}"
-            if status:
-                callback_data += f":{status}"
-
         nav_buttons.append(InlineKeyboardButton(
             text="◀️ Назад",
-            callback_data=callback_data
+            callback_data=nav_data.format(current_page - 1)
         ))
 
     # Page indicator
-    nav_buttons.append(InlineKeyboardButton(
-        text=f"📄 {current_page+1}",
-        callback_data="current_page"
-    ))
-
-    # Next page button (if there might be more items)
-    if len(items) == ITEMS_PER_PAGE:
-        if filter_type == "tag" and tag_id is not None:
-            callback_data = f"tag_list_page:{current_page+1}:{tag_id}"
-        else:
-            callback_data = f"list_page:{current_page+1}"
-            if status:
-                callback_data += f":{status}"
+    nav_buttons.append(_page_indicator_button(current_page, total_pages))
 
+    # Next page button (if there are more items, or might be when the total is unknown)
+    if total_pages:
+        has_next_page = current_page + 1 < total_pages
+    else:
+        has_next_page = len(items) == ITEMS_PER_PAGE
+    if has_next_page:
         nav_buttons.append(InlineKeyboardButton(
             text="Вперед ▶️",
-            callback_data=callback_data
+            callback_data=nav_data.format(current_page + 1)
         ))
 
-    # Build keyboard with proper layout
-    keyboard = []
-
-    # Add item buttons in rows of 6
-    for i in range(0, len(item_buttons), 6):
-        keyboard.append(item_buttons[i:i+6])
-
     # Add navigation row at the bottom
     keyboard.append(nav_buttons)
 
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+def _fetch_material_page(user_id, page, status, tag_filter) -> Awaitable[list[Record]]:
+    """Start the query for a page of the materials list."""
+    if tag_filter is not None:
+        return db.get_content_by_tags(
+            user_id=user_id,
+            tags=[tag_filter],
+            limit=ITEMS_PER_PAGE,
+            offset=page * ITEMS_PER_PAGE
+        )
+    return db.get_user_content(
+        user_id=user_id,
+        limit=ITEMS_PER_PAGE,
+        offset=page * ITEMS_PER_PAGE,
+        status=status
+    )
+
+
+def _split_message(message_text: str) -> list[str]:
+    """
+    Split a message into parts that fit in one Telegram message.
+
+    Parts are cut at the last line break under the limit, so a list item is
+    never split (unless a single line is longer than the limit).
+
+    Args:
+        message_text: Full message text
+
+    Returns:
+        list[str]: Message parts, usually just the text itself
+    """
+    parts = []
+    while len(message_text) > _MESSAGE_SPLIT_LENGTH:
+        cut = message_text.rfind("\n", 0, _MESSAGE_SPLIT_LENGTH)
+        if cut <= 0:
+            cut = _MESSAGE_SPLIT_LENGTH
+        parts.append(message_text[:cut])
+        message_text = message_text[cut:].lstrip("\n")
+    parts.append(message_text)
+    return parts
+
+
 async def show_material_page(message, user_id, page=0, status=None, tag_filter=None):
     """
     Show a specific page of materials.
@@ -166,32 +296,32 @@ async def show_material_page(message, user_id, page=0, status=None, tag_filter=N
         tag_filter: Optional tag ID filter
     """
     try:
-        # If tag_filter is provided, get materials filtered by tag
+        # Show the list with the user's latest status presses applied
+        await flush_pending_status_updates(user_id)
+
+        # Use the page prefetched by the previous page view, if it is still
+        # fresh (and possibly still running), or query it now
+        page_rows = (take_prefetched_page(user_id, (page, status, tag_filter))
+                     or _fetch_material_page(user_id, page, status, tag_filter))
+
+        # If tag_filter is provided, get materials filtered by tag. The rows
+        # already carry their tag names; the filter tag itself is looked up
+        # once, alongside the page query, for the header or empty message.
+        tag_info = None
         if tag_filter is not None:
-            content_items = await db.get_content_by_tags(
-                user_id=user_id,
-                tags=[tag_filter],
-                limit=ITEMS_PER_PAGE,
-                offset=page * ITEMS_PER_PAGE
-            )
+            content_items, tag_info = await asyncio.gather(page_rows, db.get_tag_by_id(tag_filter))
             filter_type = "tag"
         else:
             # Get paginated content items with optional status filter
-            content_items = await db.get_user_content(
-                user_id=user_id,
-                limit=ITEMS_PER_PAGE,
-                offset=page * ITEMS_PER_PAGE,
-                status=status
-            )
+            content_items = await page_rows
             filter_type = "status"
 
         if not content_items:
             if page == 0:
                 # No materials found at all
                 if tag_filter is not None:
-                    tag_info = await db.get_tag_by_id(tag_filter)
-                    tag_name = tag_info['name'] if tag_info else "выбранному тегу"
-                    await message.answer(f"У вас нет материалов с тегом '{tag_name}'.")
+                    tag_name = tag_info['name'] if tag_info else "выбранный тег"
+                    await message.answer(text.no_materials_with_tag_msg.format(tag_name=tag_name))
                 elif status == "unread":
                     await message.answer(text.no_unread_materials_msg)
                 else:
@@ -201,56 +331,46 @@ async def show_material_page(message, user_id, page=0, status=None, tag_filter=N
                 await message.answer("На этой странице нет материалов. Попробуйте предыдущую страницу.")
             return
 
+        # Every row carries the number of matching items, so the page count
+        # comes from the same query
+        total_pages = -(-content_items[0]["total_count"] // ITEMS_PER_PAGE)
+
         # Format header based on filter type
         if tag_filter is not None:
-            tag_info = await db.get_tag_by_id(tag_filter)
             tag_name = tag_info['name'] if tag_info else "выбранный тег"
-            header_text = f"📚 Материалы с тегом '{tag_name}'"
+            header = f"📚 Материалы с тегом '{tag_name}' (стр. {page+1}/{total_pages}):\n\n"
         else:
-            header_text = "📚 Ваши непрочитанные материалы" if status == "unread" else "📚 Ваши сохраненные материалы"
-
-        header = f"{header_text} (стр. {page+1}):\n\n"
+            list_header = _UNREAD_LIST_HEADER if status == "unread" else _ALL_LIST_HEADER
+            header = f"{list_header} (стр. {page+1}/{total_pages}):\n\n"
 
-        # Format the list of materials
-        numbered_list = []
+        # Format the list of materials: the item's escaped tags in bold (tag
+        # names are never empty, so an empty join means no tags), then a
+        # preview of the start of its content (list rows come pre-cut to one
+        # character past the preview, so the length check still works)
         item_index = page * ITEMS_PER_PAGE + 1
-
-        for idx, item in enumerate(content_items, start=item_index):
-            # Format content preview
-            content = item["content"]
-            tags = item.get('tags', [])
-
-            # Properly escape markdown characters in tags
-            escaped_tags = []
-            for tag in tags:
-                # Escape all special markdown characters: _*[]()~`>#+-=|{}.!
-                escaped_tag = re.sub(r'([_*\[\]()~`>#\+\-=|{}.!])', r'\\\1', tag)
-                escaped_tags.append(escaped_tag)
-
-            tags_str = " + ".join(escaped_tags) if escaped_tags else "Без тегов"
-
-            # Create a preview of the content (first 30 chars)
-            if len(content) > 30:
-                content_preview = f"{content[:30]}..."
-            else:
-                content_preview = content
-
-            # Format list item with title (content type) and preview
-            list_item = f"{idx}. **{tags_str}** {content_preview}"
-            numbered_list.append(list_item)
-
-        # Join the list items into a single message
-        materials_text = "\n".join(numbered_list)
+        materials_text = "\n".join(
+            f"{idx}. **{' + '.join(map(_escape_tag, item['tags'])) or 'Без тегов'}** "
+            f"{item['content'][:CONTENT_PREVIEW_LENGTH]}{'...' if len(item['content']) > CONTENT_PREVIEW_LENGTH else ''}"
+            for idx, item in enumerate(content_items, start=item_index)
+        )
 
         # Create inline keyboard for navigation and item selection
-        keyboard = create_materials_keyboard(content_items, page, filter_type, status, tag_filter)
+        keyboard = create_materials_keyboard(content_items, page, filter_type, status, tag_filter, total_pages)
 
-        # Send the message with keyboard
+        # Send the message with keyboard; a page with very long tags is sent
+        # in several messages, with the keyboard on the last one
+        *leading_parts, last_part = _split_message(header + materials_text)
+        for part in leading_parts:
+            await message.answer(part, parse_mode="Markdown")
         await message.answer(
-            header + materials_text,
+            last_part,
             reply_markup=keyboard,
             parse_mode="Markdown"
         )
+
+        if page + 1 < total_pages:
+            prefetch_page(user_id, (page + 1, status, tag_filter),
+                          partial(_fetch_material_page, user_id, page + 1, status, tag_filter))
     except Exception as e:
         logger.error("Error showing material page: %s", e)
         await message.answer("Произошла ошибка при отображении списка материалов.")
@@ -270,8 +390,9 @@ async def get_last_material(message: Message) -> None:
     user_id = message.from_user.id
     logger.info("User %s requested last unread material", user_id)
 
-    # Get the last unread content item from the database
-    # We'll modify the method call to include status filtering
+    # Get the last unread content item from the database, with the user's
+    # latest status presses applied
+    await flush_pending_status_updates(user_id)
     content_item = await db.get_last_content_item(user_id, status="unread")
 
     if not content_item:
@@ -296,7 +417,9 @@ async def get_random_material(message: Message) -> None:
     user_id = message.from_user.id
     logger.info("User %s requested random material", user_id)
 
-    # Get a random unread content item from the database
+    # Get a random unread content item from the database, with the user's
+    # latest status presses applied
+    await flush_pending_status_updates(user_id)
     content_item = await db.get_random_content_item(user_id)
 
     if not content_item:
@@ -334,19 +457,19 @@ async def process_page_navigation(callback: CallbackQuery) -> None:
     Args:
         callback: Callback query for page navigation
     """
-    # Parse the callback data
-    parts = callback.data.split(":")
-
-    # Extract page number
-    page = int(parts[1])
-
-    # Extract status if provided
-    status = parts[2] if len(parts) > 2 else None
+    # Parse callback data ("list_page:<page>[:<status>]", the prefix is
+    # guaranteed by the filter)
+    page_str, _, status = callback.data[len("list_page:"):].partition(":")
+    if not page_str.isdigit():
+        await callback.answer("Invalid callback data")
+        return
+    page = int(page_str)
+    status = status or None
 
     user_id = callback.from_user.id
 
-    logger.info("User %s navigating to materials page %s with status filter: %s",
-                user_id, page, status or "none")
+    logger.debug("User %s navigating to materials page %s with status filter: %s",
+                 user_id, page, status or "none")
 
     # Show the requested page with the same status filter
     await show_material_page(callback.message, user_id, page, status)
@@ -363,21 +486,19 @@ async def process_tag_page_navigation(callback: CallbackQuery) -> None:
     Args:
         callback: Callback query for page navigation with tag filter
     """
-    # Parse the callback data
-    parts = callback.data.split(":")
-
-    if len(parts) < 3:
+    # Parse callback data ("tag_list_page:<page>:<tag_id>", the prefix is
+    # guaranteed by the filter)
+    page_str, _, tag_id_str = callback.data[len("tag_list_page:"):].partition(":")
+    if not (page_str.isdigit() and tag_id_str.isdigit()):
         await callback.answer("Invalid callback data")
         return
-
-    # Extract page number and tag ID
-    page = int(parts[1])
-    tag_id = int(parts[2])
+    page = int(page_str)
+    tag_id = int(tag_id_str)
 
     user_id = callback.from_user.id
 
-    logger.info("User %s navigating to materials page %s with tag filter: %s",
-                user_id, page, tag_id)
+    logger.debug("User %s navigating to materials page %s with tag filter: %s",
+                 user_id, page, tag_id)
 
     # Show the requested page with tag filter
     await show_material_page(callback.message, user_id, page, tag_filter=tag_id)
@@ -402,7 +523,9 @@ async def view_specific_material(callback: CallbackQuery) -> None:
     logger.info("User %s viewing specific content item %s", user_id, content_id)
 
     try:
-        # Get the content item from database
+        # Get the content item from database, with the user's latest status
+        # presses applied
+        await flush_pending_status_updates(user_id)
         content_item = await db.get_content_item_by_id(content_id)
 
         if not content_item:
@@ -433,45 +556,106 @@ async def update_material_status(callback: CallbackQuery) -> None:
     Args:
         callback: Callback query from status update buttons
     """
-    # Parse callback data to get content_id and new status
-    parts = callback.data.split(":")
-    if len(parts) != 3:
+    # Parse callback data ("status:<content_id>:<status>", the prefix is
+    # guaranteed by the filter) to get content_id and new status
+    content_id_str, _, new_status = callback.data[len("status:"):].partition(":")
+    if not content_id_str.isdigit() or not new_status or ":" in new_status:
         await callback.answer("Invalid callback data")
         return
 
-    _, content_id_str, new_status = parts
     content_id = int(content_id_str)
     user_id = callback.from_user.id
 
     logger.info("User %s changing status of content %s to %s", user_id, content_id, new_status)
 
-    # Update the status in the database
-    success = await db.update_content_status(content_id, new_status)
+    # Answer right away so the button spinner stops after one round-trip; the
+    # update hasn't run yet, so the edited message (or the error message)
+    # reports the result once it is flushed
+    await callback.answer()
+
+    # Debounce: a newer press on the same item replaces the pending one, so
+    # rapid toggles end in a single UPDATE and a single edit
+    key = (user_id, content_id)
+    pending = _pending_status_updates.pop(key, None)
+    if pending:
+        pending[0].cancel()
+    timer = asyncio.get_running_loop().call_later(_STATUS_DEBOUNCE_DELAY, _start_status_flush, key)
+    _pending_status_updates[key] = (timer, new_status, callback.message)
+
+
+def _start_status_flush(key: tuple[int, int]) -> None:
+    """Start applying the latest pending status update for key once its timer fires."""
+    _, new_status, message = _pending_status_updates.pop(key)
+    # Chained on the item's running flush, so two UPDATEs of one item never
+    # race and the latest press is the one that lands
+    previous = _status_flush_tasks.get(key)
+    task = asyncio.ensure_future(_flush_status_update(*key, new_status, message, previous))
+    _status_flush_tasks[key] = task
+    task.add_done_callback(
+        lambda done: _status_flush_tasks.pop(key) if _status_flush_tasks.get(key) is done else None
+    )
+
+
+async def flush_pending_status_updates(user_id: int | None = None) -> None:
+    """
+    Apply debounced status updates now and wait until they are done.
+
+    Called before reading the user's materials: the debounce timer runs
+    outside the per-chat update order, so a read sent right after a status
+    press would otherwise see the old status. Also called on shutdown, for
+    everyone, before the database pool is closed.
+
+    Args:
+        user_id: Telegram user ID, or None for all users
+    """
+    for key in [key for key in _pending_status_updates if user_id is None or key[0] == user_id]:
+        _pending_status_updates[key][0].cancel()
+        _start_status_flush(key)
+
+    # Flushes of one item are chained, so the latest one finishes last
+    flushes = [task for key, task in _status_flush_tasks.items() if user_id is None or key[0] == user_id]
+    if flushes:
+        # wait() rather than gather(), so a cancelled read doesn't cancel the flushes
+        await asyncio.wait(flushes)
 
-    if success:
-        # Update the message to reflect the new status
-        status_text = "Прочитано" if new_status == "processed" else "Не прочитано"
-        await callback.answer(f"Статус изменен на: {status_text}")
 
+async def _flush_status_update(user_id: int, content_id: int, new_status: str, message: Message,
+                               previous: asyncio.Task | None = None) -> None:
+    """
+    Apply a debounced status update and refresh the material message.
+
+    Args:
+        user_id: Telegram user ID
+        content_id: ID of the content item
+        new_status: Status from the last press
+        message: The material message to update
+        previous: Earlier flush of the same item, if still running
+    """
+    if previous is not None:
+        # wait() neither raises the earlier flush's error nor cancels it
+        await asyncio.wait([previous])
+
+    try:
+        # Update the status; the updated row comes back from the same statement
+        updated_item = await db.update_content_status(content_id, new_status)
+
+        if updated_item:
+            # Update the message to reflect the new status
+            await edit_material_info(message, updated_item)
+
+            # If we're marking as read, add info message about availability
+            if new_status == "processed":
+                notification = text.material_marked_as_read_msg
+                # Send separate notification about using /last and /random;
+                # it has to come after the material message
+                await message.answer(notification)
+        else:
+            # The callback is already answered, so the error goes out as a message
+            await message.answer("Произошла ошибка при обновлении статуса")
+    except Exception as e:
+        logger.error("Error updating message after status change: %s", e)
+        # Runs as a background task, so nothing above would report a failed send
         try:
-            # Если успешно обновили статус, получаем обновленный материал из БД
-            updated_item = await db.get_content_item_by_id(content_id)
-            if updated_item:
-                # Отправляем новое сообщение с обновленной информацией вместо редактирования
-                # Это помогает избежать проблем с форматированием
-                await callback.message.delete()
-                await send_material_info(callback.message.chat, updated_item)
-
-                # If we're marking as read, add info message about availability
-                if new_status == "processed":
-                    notification = text.material_marked_as_read_msg
-                    # Send separate notification about using /last and /random
-                    await callback.message.answer(notification)
-            else:
-                logger.error("Could not find content item with id %s after status update", content_id)
-                await callback.answer("Ошибка: Не удалось обновить отображение материала")
-        except Exception as e:
-            logger.error("Error updating message after status change: %s", e)
-            await callback.answer("Отображение не обновлено, но статус изменен")
-    else:
-        await callback.answer("Произошла ошибка при обновлении статуса")
+            await message.answer("Произошла ошибка при обновлении статуса")
+        except Exception as send_error:
+            logger.error("Error sending status update error message: %s", send_error)
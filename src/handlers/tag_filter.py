@@ -5,12 +5,14 @@ This module provides handlers for the /bytags command
 which allows users to browse their content filtered by specific tags.
 """
 
+import asyncio
 import logging
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 
+from src.callbacks import TagCallback, TagPageCallback
 from src.states import GetTagStates
 from src.keyboards.inline import get_tags_keyboard
 from src.db.database import db
@@ -56,20 +58,21 @@ async def get_by_tags_command(message: Message, state: FSMContext) -> None:
     await state.set_state(GetTagStates.waiting_for_tag_selection)
 
 
-@router.callback_query(GetTagStates.waiting_for_tag_selection, F.data.startswith("tag:"))
-async def process_tag_filter_selection(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(GetTagStates.waiting_for_tag_selection, TagCallback.filter())
+async def process_tag_filter_selection(callback: CallbackQuery,
+                                       callback_data: TagCallback,
+                                       state: FSMContext) -> None:
     """
     Process tag selection for filtering materials.
     Only triggered when in the GetTagStates.waiting_for_tag_selection state.
     
     Args:
         callback: Callback query from tag selection keyboard
+        callback_data: Parsed tag button (tag ID, 'new' or 'skip')
         state: FSM context for managing conversation state
     """
     user_id = callback.from_user.id
-    
-    # Parse tag action from callback data
-    _, tag_data = callback.data.split(":", 1)
+    tag_data = callback_data.value
     
     # Handle 'new' or 'skip' as special cases
     if tag_data == "new":
@@ -88,31 +91,23 @@ async def process_tag_filter_selection(callback: CallbackQuery, state: FSMContex
         tag_id = int(tag_data)
         
         # Get tag name for confirmation
-        user_tags = await db.get_user_tags(user_id)
-        tag_name = next((tag['name'] for tag in user_tags if tag['id'] == tag_id), "Выбранный тег")
+        tag_names = await db.get_user_tag_names(user_id)
+        tag_name = tag_names.get(tag_id, "Выбранный тег")
         
         logger.info("User %s filtering content by tag ID %s ('%s')", user_id, tag_id, tag_name)
         
-        # Store selected tag in state for any future interactions
-        await state.update_data(selected_tag_id=tag_id, selected_tag_name=tag_name)
-        
-        # Confirm tag selection
-        await callback.answer(f"Показываю материалы с тегом '{tag_name}'")
-        
-        # Edit original message to show we're filtering
-        await callback.message.edit_text(text.filtering_by_tag_msg.format(tag_name=tag_name))
-        
-        # Get content items with this tag
-        content_items = await db.get_content_by_tags(user_id, [tag_id])
-        
-        if not content_items:
-            await callback.message.answer(text.no_materials_with_tag_msg.format(tag_name=tag_name))
-            await state.clear()
-            return
+        # Store selected tag in state for any future interactions, confirm tag
+        # selection and edit original message to show we're filtering; the
+        # three are independent, so they run concurrently
+        await asyncio.gather(
+            state.update_data(selected_tag_id=tag_id, selected_tag_name=tag_name),
+            callback.answer(f"Показываю материалы с тегом '{tag_name}'"),
+            callback.message.edit_text(text.filtering_by_tag_msg.format(tag_name=tag_name)),
+        )
         
         # Get the first page of filtered content
         # We'll reuse the same function used by the /all command
-        # but with our tag filter applied
+        # but with our tag filter applied; it also reports a tag with no materials
         await show_material_page(
             callback.message,
             user_id,
@@ -129,58 +124,28 @@ async def process_tag_filter_selection(callback: CallbackQuery, state: FSMContex
     await state.clear()
 
 
-@router.callback_query(F.data.startswith("tag_list_page:"))
-async def process_tag_page_navigation(callback: CallbackQuery) -> None:
-    """
-    Handle pagination navigation for tag-filtered materials list.
-
-    Args:
-        callback: Callback query for page navigation with tag filter
-    """
-    # Parse the callback data
-    parts = callback.data.split(":")
-    
-    if len(parts) < 3:
-        await callback.answer("Invalid callback data")
-        return
-
-    # Extract page number and tag ID
-    page = int(parts[1])
-    tag_id = int(parts[2])
-
-    user_id = callback.from_user.id
-
-    logger.info("User %s navigating to materials page %s with tag filter: %s",
-                user_id, page, tag_id)
-
-    # Show the requested page with tag filter
-    await show_material_page(callback.message, user_id, page, tag_filter=tag_id)
-
-    # Answer callback to remove the loading indicator
-    await callback.answer()
-
-@router.callback_query(GetTagStates.waiting_for_tag_selection, F.data.startswith("page:"))
-async def process_tag_selection_pagination(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(GetTagStates.waiting_for_tag_selection, TagPageCallback.filter())
+async def process_tag_selection_pagination(callback: CallbackQuery,
+                                           callback_data: TagPageCallback,
+                                           state: FSMContext) -> None:
     """
     Handle pagination for the tag selection keyboard during tag filtering.
     Only triggers when in the FilterStates.waiting_for_tag_selection state.
     
     Args:
         callback: Callback query from inline keyboard
+        callback_data: Parsed page navigation button
         state: FSM context to track conversation state
     """
     user_id = callback.from_user.id
     
     # Check if this is just the current page indicator (not a navigation button)
-    if callback.data == "page:current":
+    if callback_data.page == "current":
         await callback.answer()
         return
     
-    # Get the page number from the callback data
-    _, page_str = callback.data.split(":", 1)
-    
     try:
-        page = int(page_str)
+        page = int(callback_data.page)
         
         # Get user tags for the updated keyboard
         user_tags = await db.get_user_tags(user_id)
@@ -190,7 +155,7 @@ async def process_tag_selection_pagination(callback: CallbackQuery, state: FSMCo
             reply_markup=get_tags_keyboard(user_tags, page=page)
         )
         
-        logger.info("User %s navigated to tag page %s during tag filtering", user_id, page)
+        logger.debug("User %s navigated to tag page %s during tag filtering", user_id, page)
         
     except Exception as e:
         logger.error("Error processing tag pagination for user %s: %s", user_id, e)
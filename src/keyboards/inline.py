@@ -1,18 +1,23 @@
 """
 Inline keyboards for the bot.
 """
+from functools import lru_cache
+from typing import Mapping, Sequence
+
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 import src.text as text
-
-ITEMS_PER_PAGE = 6
+from src.callbacks import ContentTypeCallback, TagCallback, TagPageCallback
 
 
+@lru_cache(maxsize=None)
 def get_content_type_keyboard() -> InlineKeyboardMarkup:
     """
     Create keyboard with content type selection buttons.
 
+    Built once: the markup has no arguments, and callers never modify it.
+
     Returns:
         InlineKeyboardMarkup: Keyboard with text/video/skip buttons
     """
@@ -20,13 +25,13 @@ def get_content_type_keyboard() -> InlineKeyboardMarkup:
 
     # Add content type buttons
     builder.add(
-        InlineKeyboardButton(text=text.text_type_msg, callback_data="content_type:text"),
-        InlineKeyboardButton(text=text.video_type_msg, callback_data="content_type:video"),
+        InlineKeyboardButton(text=text.text_type_msg, callback_data=ContentTypeCallback(content_type="text").pack()),
+        InlineKeyboardButton(text=text.video_type_msg, callback_data=ContentTypeCallback(content_type="video").pack()),
     )
 
     # Add skip button separately
     builder.add(
-        InlineKeyboardButton(text=text.skip_type_msg, callback_data="content_type:skip")
+        InlineKeyboardButton(text=text.skip_type_msg, callback_data=ContentTypeCallback(content_type="skip").pack())
     )
 
     # Arrange buttons: main options on first row, skip on second row
@@ -35,105 +40,95 @@ def get_content_type_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
-def get_tags_keyboard(tags: list[dict] = None, page: int = 0) -> InlineKeyboardMarkup:
+# Tag keyboard layout
+TAGS_PER_ROW = 6
+MAX_ROWS = 5
+TAGS_PER_PAGE = TAGS_PER_ROW * MAX_ROWS
+
+# Control buttons shared by every tags keyboard
+_ADD_TAG_BUTTON = InlineKeyboardButton(text=text.add_new_tag_msg, callback_data=TagCallback(value="new").pack())
+_SKIP_TAGS_BUTTON = InlineKeyboardButton(text=text.skip_tags_msg, callback_data=TagCallback(value="skip").pack())
+
+
+def get_tags_keyboard(tags: Sequence[Mapping] | None = None, page: int = 0) -> InlineKeyboardMarkup:
     """
     Create keyboard with tag selection buttons with pagination.
 
+    Only the tags of the requested page are looked at; the markup is cached
+    by their (id, name) pairs, the page and the page count, so re-rendering
+    the same page (e.g. after each tag selection) reuses it.
+
     Args:
-        tags: List of tag dictionaries with 'id' and 'name' keys
+        tags: Tag rows with 'id' and 'name' keys, e.g. the records from db.get_user_tags
         page: Current page number (starting from 0)
 
     Returns:
         InlineKeyboardMarkup: Keyboard with tag buttons, navigation, and control buttons
     """
-    builder = InlineKeyboardBuilder()
-
-    # Define limits for pagination
-    TAGS_PER_ROW = 6
-    MAX_ROWS = 5
-    TAGS_PER_PAGE = TAGS_PER_ROW * MAX_ROWS
-
-    # Check if there are tags
-    if tags:
-        # Calculate total pages
-        total_pages = (len(tags) + TAGS_PER_PAGE - 1) // TAGS_PER_PAGE
-
-        # Ensure page is within valid range
-        page = max(0, min(page, total_pages - 1))
-
-        # Determine which tags to show on current page
-        start_idx = page * TAGS_PER_PAGE
-        end_idx = min(start_idx + TAGS_PER_PAGE, len(tags))
-        current_page_tags = tags[start_idx:end_idx]
-
-        # Add tag buttons for current page
-        for tag in current_page_tags:
-            builder.add(InlineKeyboardButton(
-                text=tag['name'],
-                callback_data=f"tag:{tag['id']}"
+    if not tags:
+        return _build_tags_keyboard((), 0, 0)
+
+    # Calculate total pages and ensure page is within valid range
+    total_pages = (len(tags) + TAGS_PER_PAGE - 1) // TAGS_PER_PAGE
+    page = max(0, min(page, total_pages - 1))
+
+    # Determine which tags to show on current page
+    start_idx = page * TAGS_PER_PAGE
+    page_tags = tuple((tag['id'], tag['name']) for tag in tags[start_idx:start_idx + TAGS_PER_PAGE])
+    return _build_tags_keyboard(page_tags, page, total_pages)
+
+
+@lru_cache(maxsize=1024)
+def _build_tags_keyboard(page_tags: tuple[tuple[int, str], ...],
+                         page: int,
+                         total_pages: int) -> InlineKeyboardMarkup:
+    """Build the tag selection keyboard for get_tags_keyboard from one page of (id, name) pairs."""
+    # Rows are built directly, like create_materials_keyboard does, instead of
+    # adding buttons to a builder and re-shaping them with adjust()
+    rows = []
+
+    # Add tag buttons for current page, TAGS_PER_ROW per row
+    for row_start in range(0, len(page_tags), TAGS_PER_ROW):
+        rows.append([
+            InlineKeyboardButton(text=tag_name, callback_data=TagCallback(value=str(tag_id)).pack())
+            for tag_id, tag_name in page_tags[row_start:row_start + TAGS_PER_ROW]
+        ])
+
+    # Add navigation buttons if there's more than one page
+    if total_pages > 1:
+        nav_buttons = []
+        if page > 0:
+            nav_buttons.append(InlineKeyboardButton(
+                text="◀️ Previous", callback_data=TagPageCallback(page=str(page - 1)).pack()
             ))
 
-        # Calculate rows for current page tags
-        tags_rows_count = (len(current_page_tags) + TAGS_PER_ROW - 1) // TAGS_PER_ROW
-        rows_adjustment = [min(len(current_page_tags) - i * TAGS_PER_ROW, TAGS_PER_ROW)
-                           for i in range(tags_rows_count)]
-
-        # Add navigation buttons if there's more than one page
-        if total_pages > 1:
-            nav_buttons = []
-            if page > 0:
-                nav_buttons.append(InlineKeyboardButton(
-                    text="◀️ Previous", callback_data=f"page:{page-1}"
-                ))
+        # Add page indicator
+        nav_buttons.append(InlineKeyboardButton(
+            text=f"📄 {page+1}/{total_pages}", callback_data=TagPageCallback(page="current").pack()
+        ))
 
-            # Add page indicator
+        if page < total_pages - 1:
             nav_buttons.append(InlineKeyboardButton(
-                text=f"📄 {page+1}/{total_pages}", callback_data="page:current"
+                text="Next ▶️", callback_data=TagPageCallback(page=str(page + 1)).pack()
             ))
 
-            if page < total_pages - 1:
-                nav_buttons.append(InlineKeyboardButton(
-                    text="Next ▶️", callback_data=f"page:{page+1}"
-                ))
-
-            for button in nav_buttons:
-                builder.add(button)
-
-            # Adjust navigation row width based on how many navigation buttons we have
-            rows_adjustment.append(len(nav_buttons))
-    else:
-        # Empty rows list if no tags
-        rows_adjustment = []
-
-    # Add 'add new tag' button
-    builder.add(
-        InlineKeyboardButton(
-            text=text.add_new_tag_msg,
-            callback_data="tag:new"
-        )
-    )
-
-    # Add 'skip' button separately
-    builder.add(
-        InlineKeyboardButton(
-            text=text.skip_tags_msg,
-            callback_data="tag:skip"
-        )
-    )
-
-    # Always add rows for control buttons
-    rows_adjustment.append(1)  # "Add new tag" on its own row
-    rows_adjustment.append(1)  # "Skip" on its own row at the bottom
+        rows.append(nav_buttons)
 
-    builder.adjust(*rows_adjustment)
+    # 'Add new tag' and 'skip' each get their own row, skip at the bottom
+    rows.append([_ADD_TAG_BUTTON])
+    rows.append([_SKIP_TAGS_BUTTON])
 
-    return builder.as_markup()
+    return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
+@lru_cache(maxsize=4096)
 def get_status_update_keyboard(content_id: int) -> InlineKeyboardMarkup:
     """
     Create keyboard with buttons to update content status.
 
+    Memoized per content ID: the markup depends on nothing else, and the
+    handlers only pass it to Telegram, never modify it.
+
     Args:
         content_id: ID of the content item
 
@@ -158,76 +153,3 @@ def get_status_update_keyboard(content_id: int) -> InlineKeyboardMarkup:
     builder.adjust(2)
 
     return builder.as_markup()
-
-
-def create_materials_keyboard(items, current_page, filter_type="status", status=None, tag_id=None):
-    """
-    Create an inline keyboard with numbered buttons for each item
-    and navigation buttons.
-
-    Args:
-        items: List of content items
-        current_page: Current page number
-        filter_type: Type of filter being applied ('status' or 'tag')
-        status: Optional status filter to preserve during navigation
-        tag_id: Optional tag ID filter to preserve during navigation
-
-    Returns:
-        InlineKeyboardMarkup: Keyboard with item buttons and navigation
-    """
-    # Create numbered buttons for each item
-    item_buttons = []
-    for idx, item in enumerate(items, start=1):
-        item_buttons.append(InlineKeyboardButton(
-            text=str(idx),  # Simply use sequential numbers starting from 1
-            callback_data=f"view:{item['id']}"
-        ))
-
-    # Navigation buttons with appropriate filter parameters
-    nav_buttons = []
-
-    # Previous page button (if not on first page)
-    if current_page > 0:
-        if filter_type == "tag" and tag_id is not None:
-            callback_data = f"tag_list_page:{current_page-1}:{tag_id}"
-        else:
-            callback_data = f"list_page:{current_page-1}"
-            if status:
-                callback_data += f":{status}"
-
-        nav_buttons.append(InlineKeyboardButton(
-            text="◀️ Назад",
-            callback_data=callback_data
-        ))
-
-    # Page indicator
-    nav_buttons.append(InlineKeyboardButton(
-        text=f"📄 {current_page+1}",
-        callback_data="current_page"
-    ))
-
-    # Next page button (if there might be more items)
-    if len(items) == ITEMS_PER_PAGE:
-        if filter_type == "tag" and tag_id is not None:
-            callback_data = f"tag_list_page:{current_page+1}:{tag_id}"
-        else:
-            callback_data = f"list_page:{current_page+1}"
-            if status:
-                callback_data += f":{status}"
-
-        nav_buttons.append(InlineKeyboardButton(
-            text="Вперед ▶️",
-            callback_data=callback_data
-        ))
-
-    # Build keyboard with proper layout
-    keyboard = []
-
-    # Add item buttons in rows of 6
-    for i in range(0, len(item_buttons), 6):
-        keyboard.append(item_buttons[i:i+6])
-
-    # Add navigation row at the bottom
-    keyboard.append(nav_buttons)
-
-    return InlineKeyboardMarkup(inline_keyboard=keyboard)
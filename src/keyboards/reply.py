@@ -3,15 +3,20 @@ Reply keyboards for the bot.
 
 Contains keyboard layouts for the main UI and navigation.
 """
+from functools import lru_cache
+
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
 from aiogram.utils.keyboard import ReplyKeyboardBuilder
 import src.text as text
 
 
+@lru_cache(maxsize=None)
 def get_main_keyboard() -> ReplyKeyboardMarkup:
     """
     Create the main reply keyboard with primary commands.
 
+    Built once: the markup has no arguments, and callers never modify it.
+
     Returns:
         ReplyKeyboardMarkup: Keyboard with main command buttons
     """
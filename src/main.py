@@ -4,53 +4,91 @@ Entry point for the telegram bot.
 import asyncio
 import logging
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
 from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.base import BaseStorage
 from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.fsm.storage.redis import RedisStorage
 
 from src.handlers import commands, add_material, get_material, tag_filter
-from src.consts import BOT_TOKEN
+from src.middleware import ChatOrderMiddleware
+from src.consts import BOT_TOKEN, REDIS_URL, FSM_STATE_TTL
 from src.db.database import db  # Import the database instance
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s – [%(levelname)s] %(name)s: %(message)s',
-    datefmt='%H:%M:%S'
-)
-
 logger = logging.getLogger(__name__)
 
 
+def create_storage() -> BaseStorage:
+    """
+    Create the FSM storage: Redis if REDIS_URL is configured, memory otherwise.
+
+    Returns:
+        BaseStorage: Storage for the dispatcher
+    """
+    if REDIS_URL:
+        logger.info("Using Redis FSM storage")
+        return RedisStorage.from_url(REDIS_URL, state_ttl=FSM_STATE_TTL, data_ttl=FSM_STATE_TTL)
+    return MemoryStorage()
+
+
 async def main():
     """Initialize and start the bot."""
     logger.info("Starting the bot")
 
-    # Initialize database connection
-    logger.info("Connecting to database")
-    await db.connect()
-    logger.info("Database connection established")
-
     bot = Bot(token=BOT_TOKEN)
-    storage = MemoryStorage()
+    storage = create_storage()
     dp = Dispatcher(storage=storage)
 
+    # Updates are handled as concurrent tasks; keep them in order within each chat
+    dp.update.outer_middleware(ChatOrderMiddleware())
+
     # Include routers
     dp.include_router(commands.router)
     dp.include_router(add_material.router)
     dp.include_router(get_material.router)
     dp.include_router(tag_filter.router)  # Add the new tag filter router
 
-    # Start polling
-    await bot.delete_webhook(drop_pending_updates=True)
-    logger.info("Bot started.")
-
     try:
-        await dp.start_polling(bot)
+        # Connect to the database and drop pending updates at the same time:
+        # one waits on Postgres, the other on the Telegram API. Both are let
+        # finish before a failure is raised, so the cleanup below sees a pool
+        # that is either fully open or not there.
+        logger.info("Connecting to database")
+        results = await asyncio.gather(
+            db.connect(), bot.delete_webhook(drop_pending_updates=True), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        logger.info("Database connection established")
+
+        # Start polling
+        logger.info("Bot started.")
+        await dp.start_polling(bot, handle_as_tasks=True)
     finally:
-        # Close database connection when bot stops
+        # Close database connection and the bot session when bot stops (or
+        # fails to start); closing an already closed session is a no-op
+        # Status presses still being debounced are written while the pool is open
+        await get_material.flush_pending_status_updates()
         logger.info("Closing database connection")
         await db.close()
-
+        await bot.session.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # Configured here, not on import, so importing the module leaves logging alone
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s – [%(levelname)s] %(name)s: %(message)s',
+        datefmt='%H:%M:%S'
+    )
+
+    # libuv-backed loop cuts per-await overhead on the asyncpg/aiohttp I/O path
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+Custom middlewares for the bot.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+from weakref import WeakValueDictionary
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+
+class ChatOrderMiddleware(BaseMiddleware):
+    """
+    Handle the updates of one chat one at a time, in the order they arrive.
+
+    Polling already runs every update as its own task, so a slow /all in one
+    chat doesn't hold up the others. Within a chat, though, those tasks would
+    race: a button press could be handled before the message that set up its
+    state. A per-chat lock keeps each chat in order while chats still run
+    concurrently.
+    """
+
+    def __init__(self) -> None:
+        # chat_id -> lock; a lock is dropped as soon as no update holds or waits on it
+        self._locks: WeakValueDictionary[int, asyncio.Lock] = WeakValueDictionary()
+
+    async def __call__(self,
+                       handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject,
+                       data: Dict[str, Any]) -> Any:
+        """
+        Run the handler under the lock of the update's chat.
+
+        Args:
+            handler: Next handler in the middleware chain
+            event: Incoming update
+            data: Handler context; "event_chat" is set by aiogram's user context middleware
+
+        Returns:
+            The handler's result
+        """
+        chat = data.get("event_chat")
+        if chat is None:
+            return await handler(event, data)
+
+        lock = self._locks.get(chat.id)
+        if lock is None:
+            lock = self._locks[chat.id] = asyncio.Lock()
+
+        async with lock:
+            return await handler(event, data)
@@ -48,8 +48,12 @@ filtering_by_tag_msg = "🔍 Материалы с тегом: '{tag_name}'"
 no_materials_with_tag_msg = "❌ У вас нет материалов с тегом '{tag_name}'."
 filter_cancelled_msg = "❌ Фильтрация отменена."
 
-# Material info template
-material_info_template = """
+
+# Material info template; a function with an f-string, since it is rendered
+# for every material shown and str.format would re-parse it on each call
+def build_material_info(content: str, content_type: str, date_added: str, status: str) -> str:
+    """Render the material info message."""
+    return f"""
 📎
 
 {content}
@@ -60,5 +64,6 @@ material_info_template = """
 • Статус: {status}
 """
 
+
 # Error messages
 not_url_msg = "Это не похоже на ссылку. Пожалуйста, отправьте корректную ссылку."
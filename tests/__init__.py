@@ -0,0 +1,18 @@
+"""
+Tests for the ReadLater bot. The database pool and Telegram objects are
+mocks, so no database or bot is contacted.
+
+Run with: python -m unittest
+"""
+import os
+
+# src.consts requires these at import time
+for _name, _value in {
+    "BOT_TOKEN": "0:test",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_DB": "test",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+}.items():
+    os.environ.setdefault(_name, _value)
@@ -0,0 +1,149 @@
+"""
+Tests for the in-memory caches of src.db.database.Database.
+"""
+import unittest
+from unittest import mock
+
+from src.db import database, prefetch
+
+
+def _make_db() -> database.Database:
+    """Return a Database whose pool is a mock."""
+    db = database.Database()
+    db.pool = mock.AsyncMock()
+    return db
+
+
+class UnreadIdsCacheTest(unittest.IsolatedAsyncioTestCase):
+    """/random picks from the cached unread IDs and falls back to SQL when they are stale."""
+
+    async def test_ids_are_loaded_once(self):
+        db = _make_db()
+        db.pool.fetch.return_value = [{"id": 1}, {"id": 2}]
+        db.pool.fetchrow.side_effect = lambda sql, content_id: {"id": content_id, "status": "unread"}
+
+        first = await db._pick_cached_unread(7)
+        second = await db._pick_cached_unread(7)
+
+        db.pool.fetch.assert_awaited_once_with(database._UNREAD_IDS_SQL, 7)
+        self.assertIn(first["id"], (1, 2))
+        self.assertIn(second["id"], (1, 2))
+
+    async def test_no_unread_items_falls_back(self):
+        db = _make_db()
+        db.pool.fetch.return_value = []
+
+        self.assertIsNone(await db._pick_cached_unread(7))
+        db.pool.fetchrow.assert_not_awaited()
+
+    async def test_stale_id_drops_the_entry(self):
+        db = _make_db()
+        db.pool.fetch.return_value = [{"id": 1}]
+        db.pool.fetchrow.return_value = {"id": 1, "status": "processed"}
+
+        self.assertIsNone(await db._pick_cached_unread(7))
+        self.assertNotIn(7, db._unread_ids_cache)
+
+    async def test_set_cached_unread_updates_a_cached_list(self):
+        db = _make_db()
+        db.pool.fetch.return_value = [{"id": 1}]
+        db.pool.fetchrow.return_value = {"id": 1, "status": "unread"}
+        await db._pick_cached_unread(7)
+
+        db._set_cached_unread(7, 2, True)
+        db._set_cached_unread(7, 2, True)
+        db._set_cached_unread(7, 1, False)
+        db._set_cached_unread(7, 3, False)
+
+        self.assertEqual(db._unread_ids_cache[7][1], [2])
+
+    def test_set_cached_unread_skips_uncached_users(self):
+        db = _make_db()
+
+        db._set_cached_unread(7, 1, True)
+
+        self.assertNotIn(7, db._unread_ids_cache)
+
+    async def test_writes_keep_the_cached_list_current(self):
+        db = _make_db()
+        db.pool.fetch.return_value = [{"id": 1}]
+        db.pool.fetchrow.return_value = {"id": 1, "status": "unread"}
+        await db._pick_cached_unread(7)
+
+        db.pool.fetchval.return_value = 2
+        await db.add_content_item(7, "https://example.com", "@source")
+        db.pool.fetchrow.return_value = {"id": 1, "status": "processed", "user_id": 7}
+        await db.update_content_status(1, "processed")
+
+        self.assertEqual(db._unread_ids_cache[7][1], [2])
+
+
+class PrefetchInvalidationTest(unittest.IsolatedAsyncioTestCase):
+    """Writes through Database drop the owner's prefetched list pages."""
+
+    async def asyncSetUp(self):
+        self.db = _make_db()
+        self.page = mock.AsyncMock(return_value=[])
+        prefetch.prefetch_page(7, (1, None, None), self.page)
+
+    def tearDown(self):
+        prefetch._prefetched_pages.clear()
+
+    def assertPagesDropped(self, dropped: bool = True):
+        self.assertIs(7 not in prefetch._prefetched_pages, dropped)
+
+    async def test_add_content_item(self):
+        self.db.pool.fetchval.return_value = 2
+        await self.db.add_content_item(7, "https://example.com", "@source")
+        self.assertPagesDropped()
+
+    async def test_update_content_type(self):
+        self.db.pool.fetchval.return_value = 7
+        await self.db.update_content_type(2, "video")
+        self.assertPagesDropped()
+
+    async def test_update_content_type_of_a_missing_item(self):
+        self.db.pool.fetchval.return_value = None
+        await self.db.update_content_type(2, "video")
+        self.assertPagesDropped(False)
+
+    async def test_update_content_status(self):
+        self.db.pool.fetchrow.return_value = {"id": 2, "status": "processed", "user_id": 7}
+        await self.db.update_content_status(2, "processed")
+        self.assertPagesDropped()
+
+    async def test_add_tag_to_content(self):
+        self.db.pool.fetchval.return_value = 7
+        await self.db.add_tag_to_content(2, 3)
+        self.assertPagesDropped()
+
+    async def test_existing_tag_link_keeps_pages(self):
+        self.db.pool.fetchval.return_value = None
+        await self.db.add_tag_to_content(2, 3)
+        self.assertPagesDropped(False)
+
+    async def test_add_tags_to_content(self):
+        self.db.pool.fetchval.return_value = 7
+        await self.db.add_tags_to_content(2, [3, 4, 3])
+        self.db.pool.fetchval.assert_awaited_once_with(database._ADD_TAGS_TO_CONTENT_SQL, 2, [3, 4])
+        self.assertPagesDropped()
+
+    async def test_attach_tag(self):
+        self.db.pool.fetchrow.return_value = {"id": 3, "inserted": False}
+        await self.db.attach_tag(7, 2, "news")
+        self.assertPagesDropped()
+
+    async def test_delete_content_item(self):
+        self.db.pool.fetchval.return_value = 7
+        await self.db.delete_content_item(2)
+        self.assertPagesDropped()
+
+    async def test_failed_write_keeps_pages(self):
+        self.db.pool.fetchval.side_effect = OSError("connection lost")
+        with self.assertLogs(database.logger, "ERROR"):
+            await self.db.update_content_type(2, "video")
+        self.assertPagesDropped(False)
+
+
+if __name__ == "__main__":
+    unittest.main()
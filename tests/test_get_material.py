@@ -0,0 +1,132 @@
+"""
+Tests for message splitting and debounced status updates in src.handlers.get_material.
+"""
+import asyncio
+import unittest
+from unittest import mock
+
+from src.handlers import get_material
+
+
+class SplitMessageTest(unittest.TestCase):
+    """Long lists are split at line breaks into parts Telegram accepts."""
+
+    def test_short_message_is_one_part(self):
+        self.assertEqual(get_material._split_message("1. a\n2. b"), ["1. a\n2. b"])
+
+    def test_long_message_is_split_between_lines(self):
+        lines = [f"{idx}. " + "x" * 95 for idx in range(100)]
+
+        parts = get_material._split_message("\n".join(lines))
+
+        self.assertGreater(len(parts), 1)
+        for part in parts:
+            self.assertLessEqual(len(part), get_material._MESSAGE_SPLIT_LENGTH)
+        self.assertEqual([line for part in parts for line in part.split("\n")], lines)
+
+    def test_overlong_line_is_cut_at_the_limit(self):
+        parts = get_material._split_message("x" * (get_material._MESSAGE_SPLIT_LENGTH + 10))
+
+        self.assertEqual([len(part) for part in parts], [get_material._MESSAGE_SPLIT_LENGTH, 10])
+
+
+def _status_press(user_id: int, content_id: int, status: str) -> mock.Mock:
+    """Return a status button callback with mocked answer and message."""
+    callback = mock.Mock()
+    callback.data = f"status:{content_id}:{status}"
+    callback.from_user.id = user_id
+    callback.answer = mock.AsyncMock()
+    callback.message = mock.AsyncMock()
+    return callback
+
+
+class StatusDebounceTest(unittest.IsolatedAsyncioTestCase):
+    """Status presses are debounced per item and flushed in press order."""
+
+    async def asyncSetUp(self):
+        self.updates = []
+        self.update_content_status = mock.AsyncMock(side_effect=self._update)
+        for patcher in (
+            mock.patch.object(get_material.db, "update_content_status", self.update_content_status),
+            mock.patch.object(get_material, "edit_material_info", mock.AsyncMock()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await get_material.flush_pending_status_updates()
+
+    async def _update(self, content_id, status):
+        self.updates.append((content_id, status))
+        return {"id": content_id, "status": status}
+
+    async def test_rapid_presses_end_in_one_update(self):
+        for status in ("processed", "unread", "processed"):
+            await get_material.update_material_status(_status_press(7, 2, status))
+
+        await get_material.flush_pending_status_updates(7)
+
+        self.assertEqual(self.updates, [(2, "processed")])
+
+    async def test_press_is_answered_without_a_result(self):
+        callback = _status_press(7, 2, "processed")
+
+        await get_material.update_material_status(callback)
+
+        callback.answer.assert_awaited_once_with()
+        self.assertEqual(self.updates, [])
+
+    async def test_timer_flushes_on_its_own(self):
+        with mock.patch.object(get_material, "_STATUS_DEBOUNCE_DELAY", 0.01):
+            await get_material.update_material_status(_status_press(7, 2, "processed"))
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(self.updates, [(2, "processed")])
+
+    async def test_flush_only_applies_that_users_presses(self):
+        await get_material.update_material_status(_status_press(7, 2, "processed"))
+        await get_material.update_material_status(_status_press(8, 3, "processed"))
+
+        await get_material.flush_pending_status_updates(7)
+
+        self.assertEqual(self.updates, [(2, "processed")])
+
+    async def test_flushes_of_one_item_run_in_order(self):
+        release = asyncio.Event()
+        events = []
+
+        async def update(content_id, status):
+            events.append(("start", status))
+            if status == "processed":
+                await release.wait()
+            events.append(("end", status))
+            return {"id": content_id, "status": status}
+
+        self.update_content_status.side_effect = update
+        await get_material.update_material_status(_status_press(7, 2, "processed"))
+        # Let the first UPDATE start, then press again while it runs
+        flushing = asyncio.ensure_future(get_material.flush_pending_status_updates(7))
+        await asyncio.sleep(0)
+        await get_material.update_material_status(_status_press(7, 2, "unread"))
+        second = asyncio.ensure_future(get_material.flush_pending_status_updates(7))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(flushing, second)
+
+        self.assertEqual(events, [("start", "processed"), ("end", "processed"),
+                                  ("start", "unread"), ("end", "unread")])
+        self.assertEqual(get_material._status_flush_tasks, {})
+
+    async def test_failed_update_reports_an_error(self):
+        self.update_content_status.side_effect = None
+        self.update_content_status.return_value = None
+        callback = _status_press(7, 2, "processed")
+
+        await get_material.update_material_status(callback)
+        await get_material.flush_pending_status_updates(7)
+
+        callback.message.answer.assert_awaited_once_with("Произошла ошибка при обновлении статуса")
+
+
+if __name__ == "__main__":
+    unittest.main()
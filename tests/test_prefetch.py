@@ -0,0 +1,79 @@
+"""
+Tests for the prefetched list pages of src.db.prefetch.
+"""
+import asyncio
+import unittest
+from unittest import mock
+
+from src.db import prefetch
+
+
+class PrefetchTest(unittest.IsolatedAsyncioTestCase):
+    """Prefetched pages are taken once, expire, and are bounded in number."""
+
+    def tearDown(self):
+        prefetch._prefetched_pages.clear()
+
+    async def test_page_is_taken_once(self):
+        fetch = mock.AsyncMock(return_value=["row"])
+        prefetch.prefetch_page(7, (1, None, None), fetch)
+
+        task = prefetch.take_prefetched_page(7, (1, None, None))
+
+        self.assertEqual(await task, ["row"])
+        self.assertIsNone(prefetch.take_prefetched_page(7, (1, None, None)))
+
+    async def test_other_pages_are_not_taken(self):
+        prefetch.prefetch_page(7, (1, None, None), mock.AsyncMock())
+
+        self.assertIsNone(prefetch.take_prefetched_page(7, (1, "unread", None)))
+        self.assertIsNone(prefetch.take_prefetched_page(8, (1, None, None)))
+
+    async def test_expired_page_is_not_taken(self):
+        with mock.patch.object(prefetch, "_PREFETCH_TTL", 0.0):
+            prefetch.prefetch_page(7, (1, None, None), mock.AsyncMock())
+
+        self.assertIsNone(prefetch.take_prefetched_page(7, (1, None, None)))
+
+    async def test_drop_forgets_only_that_user(self):
+        prefetch.prefetch_page(7, (1, None, None), mock.AsyncMock())
+        prefetch.prefetch_page(8, (1, None, None), mock.AsyncMock())
+
+        prefetch.drop_prefetched_pages(7)
+
+        self.assertIsNone(prefetch.take_prefetched_page(7, (1, None, None)))
+        self.assertIsNotNone(prefetch.take_prefetched_page(8, (1, None, None)))
+
+    async def test_least_recently_prefetched_user_is_evicted(self):
+        with mock.patch.object(prefetch, "_PREFETCH_MAX_USERS", 2):
+            prefetch.prefetch_page(7, (1, None, None), mock.AsyncMock())
+            prefetch.prefetch_page(8, (1, None, None), mock.AsyncMock())
+            # Prefetching again moves user 7 behind user 8
+            prefetch.prefetch_page(7, (2, None, None), mock.AsyncMock())
+            prefetch.prefetch_page(9, (1, None, None), mock.AsyncMock())
+
+        self.assertEqual(list(prefetch._prefetched_pages), [7, 9])
+        self.assertEqual(len(prefetch._prefetched_pages[7]), 2)
+
+    async def test_no_prefetch_past_the_task_limit(self):
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_fetch():
+            started.set()
+            await release.wait()
+
+        fetch = mock.AsyncMock()
+        with mock.patch.object(prefetch, "_PREFETCH_MAX_TASKS", 1):
+            prefetch.prefetch_page(7, (1, None, None), slow_fetch)
+            await started.wait()
+            prefetch.prefetch_page(8, (1, None, None), fetch)
+
+        fetch.assert_not_called()
+        self.assertNotIn(8, prefetch._prefetched_pages)
+        release.set()
+        await prefetch.take_prefetched_page(7, (1, None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()